@@ -0,0 +1,118 @@
+import os
+import csv
+import argparse
+import tempfile
+import datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+from cpicsi.search import add_search_arguments, search_settings_from_args
+
+#################################################
+
+
+    # parsing flags
+
+
+#################################################
+
+STEPS = ["clean", "merge", "validate", "fit", "predict", "plot"]
+
+parser = argparse.ArgumentParser(description="""
+        Time every step of the monthly pipeline, cleaning the csi,
+        merging and validating the data, fitting, predicting and
+        plotting, on synthetic cpi and csi series of growing length, and
+        append the results to a csv file to compare runs over time, for
+        example before and after upgrading pandas or FLAML.
+""")
+parser.add_argument("-n", "--rows", dest="sizes", type=int, nargs="+",
+                    default=[10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6], help="""
+        Number of rows of the synthetic series, every size is timed in
+        its own process. Series longer than pandas' range of months are
+        made of days, hours or minutes instead.
+""")
+parser.add_argument("--steps", dest="steps", nargs="+", choices=STEPS, default=STEPS, help="""
+        Steps to time, all of them by default.
+""")
+parser.add_argument("--horizon", dest="horizon", type=int, default=12, help="""
+        Number of periods after the series that are predicted.
+""")
+parser.add_argument("--data-seed", dest="data_seed", type=int, default=0, help="""
+        Random seed of the synthetic series.
+""")
+parser.add_argument("-f", "--format", dest="fmt", choices=["csv", "parquet", "feather"], default="csv", help="""
+        Storage format of the synthetic data file, csv by default.
+""")
+parser.add_argument("-w", "--workdir", dest="workdir", help="""
+        Directory to keep the synthetic files and plots in, a temporary
+        directory that is removed at the end by default.
+""")
+parser.add_argument("-o", "--outfile", dest="outfile", default="bench.csv", help="""
+        Path to the csv file the results are appended to with the columns
+        timestamp,rows,step,seconds,peak_rss_mb,python,pandas,flaml,xgboost .
+""")
+add_search_arguments(parser)
+
+def main():
+    args = parser.parse_args()
+
+    if min(args.sizes) <= args.horizon:
+        print(f"""[{dt.datetime.now()}] Error:
+        The synthetic series need more rows than the horizon of
+        {args.horizon} periods. Sizes provided: {args.sizes}
+    """)
+        quit(-1)
+
+    # a fixed number of trials times the same search on any machine
+    settings = {"time_budget": -1, "max_iter": 3, "log_file_name": "", "verbose": 0,
+                **search_settings_from_args(args)}
+
+    #################################################
+
+
+        # time every size in its own process
+
+
+    #################################################
+
+    from cpicsi.bench import bench_size, library_versions
+
+    results = []
+    found = library_versions()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+
+        for rows in args.sizes:
+            directory = os.path.join(workdir, f"rows_{rows}")
+
+            # a new process for every size, so memory doesn't carry over
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                timed = pool.submit(bench_size, rows, directory, args.steps, args.horizon,
+                                    args.data_seed, args.fmt, settings).result()
+
+            for step, seconds, peak in timed:
+                print(f"[{dt.datetime.now()}] {rows} rows, {step}: {seconds:.3f}s, peak memory {peak} MB")
+                results.append([dt.datetime.now().isoformat(timespec="seconds"), rows, step,
+                                round(seconds, 6), peak, *found])
+
+    #################################################
+
+
+        # save results
+
+
+    #################################################
+
+    new_file = not os.path.exists(args.outfile)
+
+    with open(args.outfile, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["timestamp", "rows", "step", "seconds", "peak_rss_mb",
+                             "python", "pandas", "flaml", "xgboost"])
+        writer.writerows(results)
+
+    print(f"[{dt.datetime.now()}] Saved {len(results)} results to {args.outfile}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,6 @@
-import datetime as dt
-import pandas as pd
 import sys
 import argparse
-from io import StringIO
+import datetime as dt
 
 #################################################
 
@@ -30,6 +28,10 @@ parser.add_argument("csi_path", help="""
 parser.add_argument("-o", "--outfile", dest="outfile", default="csi_clean.csv", help="""
         The path for the outfile, the clean csi data.
 """)
+parser.add_argument("-c", "--column", dest="column", default="Index", help="""
+        Column of the raw table to keep as the csi, for tables with more
+        than one series.
+""")
 
 args = parser.parse_args()
 
@@ -67,23 +69,10 @@ if len(args.csi_path) < 1:
 
 #################################################
 
-file_csi = open(args.csi_path)
-lines = file_csi.readlines()
-lines = lines[1:]
-new_lines = []
-
-for l in lines:
-    new_lines.append(l[:len(l)-2] + l[len(l)-1])
-    
-final_line = ""
-
-for l in new_lines:
-    final_line += l
-
-io_dirty = StringIO(final_line)
-
-df_dirty = pd.read_csv(io_dirty)
-df_dirty['date'] = [dt.date(x, y, 1) for x, y in zip(df_dirty['Year'], df_dirty['Month'])]
-df_dirty = df_dirty.rename(columns = {'Index': 'csi'})
+from cpicsi import clean_csi
 
-df_dirty.to_csv(args.outfile, columns = ['csi', 'date'], index = False)
+try:
+    clean_csi(args.csi_path, args.outfile, args.column)
+except (ValueError, OSError) as e:
+    print(f"[{dt.datetime.now()}] Error: {e}")
+    quit(-1)
@@ -2,9 +2,8 @@ import os
 import sys
 import argparse
 import datetime as dt
-import pandas as pd
-import numpy as np
-from flaml import AutoML
+from cpicsi.search import add_search_arguments, search_settings_from_args
+from cpicsi.telemetry import Metrics
 
 #################################################
 
@@ -33,18 +32,128 @@ parser.add_argument("csi_path", nargs="?", help="""
         consumers by the University of Michigan. If -d flag is used, 
         this shouldn't be provided.
 """)
-parser.add_argument("-t", "--test-csi", dest="csi_test", type=float, help="""
+parser.add_argument("-t", "--test-csi", dest="csi_test", type=float, nargs="+", help="""
         Consumer survey index to be used in the next month's prediction.
+        Several values can be given to predict one scenario for each.
+""")
+parser.add_argument("--csi-range", dest="csi_range", type=float, nargs=3,
+                    metavar=("START", "STOP", "STEP"), help="""
+        Range of consumer survey indexes to predict scenarios for, STOP
+        included. STEP is negative if STOP is below START. Can be
+        combined with -t and --csi-file.
+""")
+parser.add_argument("--csi-file", dest="csi_file", help="""
+        Path to a csv file with a csi column containing the consumer
+        survey indexes to predict scenarios for.
+""")
+parser.add_argument("-H", "--horizon-csi", dest="horizon_csi", type=float, nargs="+", help="""
+        Consumer survey index for each of the following months, one value
+        per month. Predicts all of these months with a single model
+        instead of only the next month, the -t flag is then not needed.
+""")
+parser.add_argument("-s", "--scenario-out", dest="scenario_out", help="""
+        Path to the outfile for the scenario predictions with the columns
+        timestamp,csi,predicted_cpi . Only used when more than one csi is
+        given, if not provided, they are printed to standard output.
 """)
 parser.add_argument("-o", "--outfile", dest="outfile", help="""
         Path to outfile, if it already exists, appends result to it, if it
         doesn't, create a new one and write all of the past data and the
         result.
 """)
+parser.add_argument("--csi-asof", dest="asof", action="store_true", help="""
+        Match every month of the cpi with the last csi dated in the same
+        month, for preliminary mid month csi or weekly or daily sentiment
+        series. By default every month can only have one csi.
+""")
 parser.add_argument("-d", "--data-file", dest="data_file", help="""
         Path to the file containing the required data with the columns
         timestamp,csi,cpi,predicted_cpi .
 """)
+parser.add_argument("-f", "--format", dest="fmt", choices=["csv", "parquet", "feather"], help="""
+        Storage format of the data file and outfile, csv, parquet or
+        feather. If not provided, it is guessed from the file extension.
+""")
+parser.add_argument("-m", "--model", dest="model_path", help="""
+        Path prefix for the model store, the fitted model is saved to
+        PREFIX.model.pkl and its best config to PREFIX.model.json . If not
+        provided, the store is kept next to the -d data file or the -o
+        outfile.
+""")
+parser.add_argument("--cached", dest="cached", action="store_true", help="""
+        Predict straight from the stored model without searching again.
+        Only used if the stored model was trained up to the last month in
+        the data, otherwise the search is warm started.
+""")
+parser.add_argument("--cold", dest="cold", action="store_true", help="""
+        Ignore the stored config and cached predictions and run the full
+        search from scratch.
+""")
+parser.add_argument("--update", dest="update", action="store_true", help="""
+        When months were added since the stored model was trained, refit
+        its best config on all of the data without searching again. The
+        full search is still run every --refit-every months, or when the
+        stored model predicts the new months with an error more than
+        --drift times its loss.
+""")
+parser.add_argument("--refit-every", dest="refit_every", type=int, default=12, help="""
+        Months after the last full search when --update searches again,
+        12 by default.
+""")
+parser.add_argument("--drift", dest="drift", type=float, default=3.0, help="""
+        How many times the validation loss of the stored model its error
+        on the new months can be before --update searches again, 3 by
+        default.
+""")
+parser.add_argument("--no-cache", dest="no_cache", action="store_true", help="""
+        Don't use or save cached predictions. By default the predictions
+        are cached in PREFIX.cache.json next to the model store, and a
+        run with the same data, search settings and csi returns them
+        without training.
+""")
+parser.add_argument("--cache-size", dest="cache_size", type=int, default=256, help="""
+        Maximum number of cached predictions, the least recently used
+        ones are dropped first.
+""")
+parser.add_argument("--features", dest="features", action="store_true", help="""
+        Train with lags, rolling means and the monthly change of the csi
+        and lags of the cpi besides the csi. The features are stored in
+        PREFIX.features.pkl next to the model store and only computed for
+        the months added since the last run. Can't be used with -M.
+""")
+parser.add_argument("-i", "--intervals", dest="intervals", action="store_true", help="""
+        Predict an interval around every prediction, from the errors of an
+        ensemble of models with the best config found, each one trained up
+        to one of the last --members months. The members are trained in
+        parallel with -j workers. The bounds are saved in the lower_cpi,
+        upper_cpi columns of the outfile and the scenarios.
+""")
+parser.add_argument("--level", dest="level", type=float, default=0.9, help="""
+        Probability of the prediction intervals, 0.9 by default.
+""")
+parser.add_argument("--members", dest="members", type=int, default=20, help="""
+        Number of models in the ensemble of the prediction intervals.
+""")
+parser.add_argument("-M", "--multi", dest="multi", action="store_true", help="""
+        Read cpi_path as a file of many FRED series, wide with one column
+        per series or long with the columns observation_date,series_id,
+        value, and forecast every series in parallel. The forecasts of all
+        of them are appended to the -o csv outfile with the columns series,
+        timestamp,csi,predicted_cpi,train_rows,best_loss or printed.
+""")
+parser.add_argument("--series", dest="series", nargs="+", help="""
+        Series to forecast with -M, all of them by default.
+""")
+parser.add_argument("-j", "--jobs", dest="jobs", type=int, help="""
+        Number of series forecast in parallel with -M, or of ensemble
+        members trained in parallel with -i, defaults to the number of
+        cores.
+""")
+add_search_arguments(parser)
+parser.add_argument("--metrics", dest="metrics", help="""
+        Path to a json lines file to append the time and peak memory of
+        every step of the run and of every automl trial to.
+""")
 
 #################################################
 
@@ -54,11 +163,13 @@ parser.add_argument("-d", "--data-file", dest="data_file", help="""
 
 #################################################
 
-args = parser.parse_args()
+def main():
+    args = parser.parse_args()
 
-if not args.csi_test:
-    print(f"""[{dt.datetime.now()}] Error:
-        The -t flag was not provided, it is required.
+    if not (args.csi_test or args.csi_range or args.csi_file or args.horizon_csi):
+        print(f"""[{dt.datetime.now()}] Error:
+        The -t flag was not provided, it is required unless -H,
+        --csi-range or --csi-file are used.
         Corect usage:
             
             python cpi-csi.py path_to_cpi.csv path_to_csi.csv -t csi_test
@@ -71,11 +182,49 @@ if not args.csi_test:
             
             python cpi-csi.py --help
     """)
-    quit(-1)
+        quit(-1)
 
-if not args.data_file:
-    if len(sys.argv) < 3:
-        print(f"""[{dt.datetime.now()}] Error:
+    if args.csi_range:
+        start, stop, step = args.csi_range
+
+        if step == 0 or (stop - start) * step < 0:
+            print(f"""[{dt.datetime.now()}] Error:
+        The --csi-range STEP {step} doesn't go from START {start} to STOP {stop},
+        it can't be 0 and it has to be negative if STOP is below START.
+        Correct usage:
+
+            python cpi-csi.py path_to_cpi.csv path_to_csi.csv --csi-range 60 70 2.5
+
+        If you want help run:
+
+            python cpi-csi.py --help
+    """)
+            quit(-1)
+
+    if args.multi:
+        flags = [flag for flag, used in [("-i", args.intervals), ("--features", args.features),
+                                         ("--cached", args.cached), ("--update", args.update),
+                                         ("-m", args.model_path), ("-s", args.scenario_out),
+                                         ("-f", args.fmt)] if used]
+
+        if flags:
+            print(f"""[{dt.datetime.now()}] Error:
+            The -M flag forecasts every series to a csv file without a
+            model store, features or intervals, it can't be used with
+            {', '.join(flags)} .
+            Correct usage:
+
+                python cpi-csi.py -M path_to_many_cpi.csv path_to_csi.csv -t csi_test -o outfile.csv
+
+            If you want help run:
+
+                python cpi-csi.py --help
+        """)
+            quit(-1)
+
+    if not args.data_file:
+        if len(sys.argv) < 3:
+            print(f"""[{dt.datetime.now()}] Error:
             There was no path provided for the monthly cpi and csi data.
             Corect usage:
                 
@@ -89,10 +238,10 @@ if not args.data_file:
                 
                 python cpi-csi.py --help
         """)
-        quit(-1)
+            quit(-1)
 
-    if len(args.cpi_path) < 1 or len(args.csi_path) < 1:
-        print(f"""[{dt.datetime.now()}] Error:
+        if len(args.cpi_path) < 1 or len(args.csi_path) < 1:
+            print(f"""[{dt.datetime.now()}] Error:
             There was not path provided for the monthly cpi or csi data.
             Paths provided, cpi: {args.cpi_path} , csi:{args.csi_path} .
 
@@ -106,11 +255,24 @@ if not args.data_file:
                 
                 python cpi-csi.py --help
         """)
-        quit(-1)
+            quit(-1)
 
-else:
-    if len(args.data_file) < 1:
-        print(f"""[{dt.datetime.now()}] Error:
+    else:
+        if args.multi:
+            print(f"""[{dt.datetime.now()}] Error:
+            The -M flag reads the series from cpi_path, it can't be used
+            with the -d flag. Correct usage:
+
+                python cpi-csi.py -M path_to_many_cpi.csv path_to_csi.csv -t csi_test
+
+            If you want help run:
+
+                python cpi-csi.py --help
+        """)
+            quit(-1)
+
+        if len(args.data_file) < 1:
+            print(f"""[{dt.datetime.now()}] Error:
             There was not path provided for the monthly data file.
             Path provided: {args.data_file} . Correct usage:
 
@@ -124,158 +286,347 @@ else:
                 
                 python cpi-csi.py --help
         """)
+            quit(-1)
+
+    #################################################
+
+
+        # load heavy dependencies only once the flags are valid
+
+
+    #################################################
+
+    import pandas as pd
+    import numpy as np
+    from cpicsi import (
+        AUTOML_SETTINGS,
+        load_series,
+        load_csi_values,
+        data_format,
+        merge_cpi_csi,
+        unmatched_warnings,
+        validate_data_file,
+        train,
+        predict,
+        predict_scenarios,
+        prediction_rows,
+        append_predictions,
+        ModelStore,
+        model_info,
+        refit,
+        update_plan,
+        load_cpi_series,
+        merge_series,
+        forecast_series,
+        append_forecasts,
+        feature_spec,
+        add_features,
+        future_features,
+        scenario_features,
+        FeatureStore,
+        member_errors,
+        prediction_intervals,
+        PredictionCache,
+        prediction_key,
+    )
+
+    csi_tests = list(args.csi_test or [])
+
+    if args.csi_range:
+        start, stop, step = args.csi_range
+        csi_tests += list(np.arange(start, stop + step / 2, step))
+
+    if args.csi_file:
+        try:
+            csi_tests += load_csi_values(args.csi_file)
+        except (ValueError, OSError) as e:
+            print(f"[{dt.datetime.now()}] Error: {e}")
+            quit(-1)
+
+    if len(csi_tests) < 1 and not args.horizon_csi:
+        print(f"[{dt.datetime.now()}] Error: {args.csi_file} doesn't contain any csi.")
         quit(-1)
 
-df = pd.DataFrame()
-input_df = pd.DataFrame()
+    metrics = Metrics(args.metrics, "cpi-csi.py")
+
+    try:
+        settings = search_settings_from_args(args)
+
+        if not args.data_file:
+
+            #################################################
+
 
-if not args.data_file:
+                # open cpi and csi files
+
+
+            #################################################
+
+            print(f"[{dt.datetime.now()}] Loading cpi data from {args.cpi_path}")
+            with metrics.span("load", path=args.cpi_path):
+                df_cpi = load_cpi_series(args.cpi_path) if args.multi else load_series(args.cpi_path)
+            print(f"[{dt.datetime.now()}] Loading csi data from {args.csi_path}")
+            with metrics.span("load", path=args.csi_path):
+                df_csi = load_series(args.csi_path)
+
+            with metrics.span("merge") as span:
+                df = merge_series(df_cpi, df_csi, args.asof) if args.multi else merge_cpi_csi(df_cpi, df_csi, args.asof)
+                span["rows"] = len(df)
+
+            for warning in unmatched_warnings(df):
+                print(f"[{dt.datetime.now()}] Warning: {warning}")
+
+        else:
+
+            #################################################
+
+
+                # open data file and check for missing stuff
+
+
+            #################################################
+
+            print(f"[{dt.datetime.now()}] Loading data from {args.data_file}")
+            with metrics.span("validate", path=args.data_file) as span:
+                df, report = validate_data_file(args.data_file, args.fmt)[1:]
+                span["rows"] = len(df)
+
+            for warning in report.warnings:
+                print(f"[{dt.datetime.now()}] Warning: {warning}")
+
+    except (ValueError, OSError) as e:
+        print(f"[{dt.datetime.now()}] Error: {e}")
+        quit(-1)
 
     #################################################
 
 
-        # open cpi and csi files
+        # forecast many series
 
 
     #################################################
 
-    print(f"[{dt.datetime.now()}] Loading cpi data from {args.cpi_path}")
-    df_cpi = pd.read_csv(args.cpi_path)
-    print(f"[{dt.datetime.now()}] Loading csi data from {args.csi_path}")
-    df_csi = pd.read_csv(args.csi_path)
+    if args.multi:
+        if args.outfile and data_format(args.outfile) != 'csv':
+            print(f"[{dt.datetime.now()}] Error: the -M forecasts are appended to a csv file, {args.outfile} isn't one")
+            quit(-1)
 
-    if len(df_cpi) < 1:
-        print(f"[{dt.datetime.now()}] Error: cpi csv doesn't contain any rows.")
-        quit(-1)
+        series = args.series or list(df.columns[2:])
+        unknown = [s for s in series if s not in df.columns[2:]]
 
-    if len(df_csi) < 1:
-        print(f"[{dt.datetime.now()}] Error: csi csv doesn't contain any rows.")
-        quit(-1)
+        if unknown:
+            print(f"[{dt.datetime.now()}] Error: {args.cpi_path} doesn't contain the series {', '.join(unknown)}")
+            quit(-1)
 
-    df_cpi = df_cpi.rename(columns = {'observation_date': 'date', 'CPIAUCSL': 'cpi'})
+        with metrics.span("fit", series=len(series), jobs=args.jobs):
+            forecasts = forecast_series(df, series, csi_tests, args.horizon_csi, args.jobs, **settings)
 
-    df = df_cpi.merge(df_csi, on='date')
-    df = df.rename(columns = {'date': 'timestamp'})
+        if args.outfile:
+            print(f"[{dt.datetime.now()}] Saving {len(forecasts)} forecasts to {args.outfile}")
+            try:
+                with metrics.span("save", path=args.outfile):
+                    append_forecasts(args.outfile, forecasts)
+            except (ValueError, OSError) as e:
+                print(f"[{dt.datetime.now()}] Error: {e}")
+                quit(-1)
+        else:
+            print(forecasts.to_csv(index=False), end="")
 
-else:
+        metrics.finish()
+        quit()
 
     #################################################
 
 
-        # open data file and check for missing stuff
+        # create and train model and make prediction
 
 
     #################################################
 
-    print(f"[{dt.datetime.now()}] Loading data from {args.data_file}")
-    input_df = pd.read_csv(args.data_file)
-    df = pd.read_csv(args.data_file)
+    store = None
+    model_path = args.model_path or args.data_file or args.outfile
 
-    del df['predicted_cpi']
+    if model_path:
+        store = ModelStore(model_path)
 
-    if list(input_df.columns) != ['timestamp', 'cpi','csi','predicted_cpi']:
-        print(f"""[{dt.datetime.now()}]
-              File doesn't contain necessary columns:
+    last_month = pd.to_datetime(df['timestamp'].max())
+    next_month = last_month + pd.DateOffset(months = 1)
+    period = 1
 
-              timestamp,cpi,csi,predicted_cpi
-        """)
-        quit(-1)
+    if args.horizon_csi:
+        period = len(args.horizon_csi)
+        months = pd.date_range(next_month, periods=period, freq='MS')
+        X_test = pd.DataFrame({'timestamp' : months, 'csi' : args.horizon_csi})
+    else:
+        X_test = pd.DataFrame({'timestamp' : next_month, 'csi' : csi_tests})
 
+    spec = feature_spec(period) if args.features else None
+    interval_spec = {"members": args.members, "level": args.level} if args.intervals else None
 
-    if len(df) < 1:
-        print(f"[{dt.datetime.now()}] Error: data file doesn't contain any rows")
-        quit(-1)
+    cache = None
+    cached = None
 
-    i = 1
-    aa = np.where(pd.isnull(input_df))
-    for a in aa[1]:
-        cols = ['timestamp', 'cpi', 'csi']
-        i += 1
+    if store and not args.no_cache:
+        cache = PredictionCache(store.cache, args.cache_size)
+        key = prediction_key(df, settings, period, X_test['timestamp'], X_test['csi'], spec, interval_spec)
 
-        if a == 0 or a == 1 or a == 2:
-            print(f"""[{dt.datetime.now()}] Error:
-    There are missing values in the {cols[a]} column. There should
-    be no missing values in this column. The first missing value is
-    in row {i}.
-            """)
-            quit(-1)
+        if not args.cold:
+            cached = cache.get(key)
 
-    if len(input_df['timestamp'].unique()) != len(input_df['timestamp']):
-            print(f"""[{dt.datetime.now()}] Error:
-    The values in the timestamp column are not unique. Please make
-    sure that they are.
-            """)
-            quit(-1)
+        if cached:
+            model = cached["model"]
+            print(f"[{dt.datetime.now()}] Using cached predictions from {cache.path}, "
+                  f"{model['best_estimator']} trained until {model['trained_until']} with loss {model['best_loss']}")
+            metrics.write("cache", hit=True, path=cache.path)
 
-#################################################
+    automl = None
 
+    if cached is None and store and args.cached:
+        with metrics.span("load_model", path=store.pkl):
+            automl = store.load_model(last_month, period, spec)
 
-    # create and train model and make prediction
+        if automl:
+            print(f"[{dt.datetime.now()}] Loaded stored model from {store.pkl}")
 
+    train_df = df
 
-#################################################
+    if cached is None and spec:
+        with metrics.span("features") as span:
+            if store:
+                train_df, span["computed"] = FeatureStore(store.features).features(df, spec)
+            else:
+                train_df = add_features(df, spec)
 
-automl = AutoML()
+        # the first months don't have enough history for every feature
+        train_df = train_df.dropna()
 
-automl_settings = {
-    "time_budget": 1,  
-    "metric": "mape",  
-    "task": "ts_forecast",  
-    "log_file_name": "cpi-csi.log",
-    "eval_method": "holdout",
-    "log_type": "all",
-    "label": "cpi",
-    "estimator_list": ["xgboost"],
-}
+    if cached is None and automl is None and store and args.update and not args.cold:
+        with metrics.span("load_model", path=store.pkl):
+            stored, info = store.load(None, period, spec)
 
-next_month = pd.to_datetime(df['timestamp'].max()) + pd.DateOffset(months = 1)
-X_test = pd.DataFrame({'timestamp' : [next_month], 'csi' : args.csi_test})
+        if stored:
+            if info["trained_until"] == str(last_month.date()):
+                print(f"[{dt.datetime.now()}] Stored model from {store.pkl} is up to date")
+                automl = stored
+            else:
+                with metrics.span("update_plan") as span:
+                    plan, reason, span["error"] = update_plan(info, stored, train_df, args.refit_every, args.drift)
+                    span["plan"] = plan
 
-automl.fit(dataframe=df, **automl_settings, period=1)
+                if plan == "update":
+                    print(f"[{dt.datetime.now()}] Refitting {info['best_estimator']} with the stored config, {reason}")
 
-prediction = automl.predict(X_test)
-print(next_month, " cpi prediction:", prediction.to_list()[0])
-prediction = round(prediction.to_list()[0], 3)
+                    with metrics.span("refit", period=period):
+                        automl = refit(train_df, info["best_estimator"], info["best_config"], period, **settings)
 
-#################################################
+                    print(f"[{dt.datetime.now()}] Saving model to {store.pkl}")
+                    with metrics.span("save_model", path=store.pkl):
+                        store.save(automl, last_month, period, spec, info.get("searched_until"), info["best_loss"])
+                else:
+                    print(f"[{dt.datetime.now()}] Searching again, {reason}")
 
+    if cached is None and automl is None:
+        starting_points = None
 
-    # save data
+        if store and not args.cold:
+            starting_points = store.starting_points()
 
+            if starting_points:
+                print(f"[{dt.datetime.now()}] Warm starting search from {store.json}")
 
-#################################################
+        with metrics.span("fit", period=period, warm_start=bool(starting_points)) as span:
+            automl = train(train_df, period=period, starting_points=starting_points, **settings)
+            span["best_estimator"] = automl.best_estimator
+            span["best_loss"] = automl.best_loss
 
-if args.outfile:
-    if os.path.exists(args.outfile):
-        res = pd.read_csv(args.outfile)
+        metrics.trials(settings.get("log_file_name", AUTOML_SETTINGS["log_file_name"]))
 
-        if list(res.columns) != list(df.columns) + ['predicted_cpi']:
-            print("""
-                  File doesn't contain necessary columns:
+        if store:
+            print(f"[{dt.datetime.now()}] Saving model to {store.pkl}")
+            with metrics.span("save_model", path=store.pkl):
+                store.save(automl, last_month, period, spec)
 
-                  timestamp,cpi,csi,predicted_cpi
-            """)
+    if cached is None and interval_spec:
+        try:
+            with metrics.span("ensemble", members=args.members, jobs=args.jobs):
+                errors = member_errors(train_df, automl, period, args.members, args.jobs, **settings)
+        except ValueError as e:
+            print(f"[{dt.datetime.now()}] Error: {e}")
             quit(-1)
 
-        to_append = pd.DataFrame([[next_month.date(), np.nan, np.nan, prediction]], columns=list(res.columns))
-        res = res._append(to_append, ignore_index=True)
-        res['timestamp'] = pd.to_datetime(res['timestamp']).dt.date
-        res.to_csv(args.outfile, index=False)
-
+    if not args.horizon_csi and len(csi_tests) > 1:
+        if cached:
+            scenarios = pd.DataFrame({'timestamp' : next_month.date(), 'csi' : csi_tests,
+                                      'predicted_cpi' : cached["predictions"]})
+            lower, upper = cached.get("lower"), cached.get("upper")
+        else:
+            X_scenarios = scenario_features(df, next_month, csi_tests, spec) if spec else None
+
+            with metrics.span("predict", rows=len(csi_tests)):
+                scenarios = predict_scenarios(automl, next_month, csi_tests, X_scenarios)
+
+            lower = upper = None
+            if interval_spec:
+                lower, upper = prediction_intervals(scenarios['predicted_cpi'], errors, args.level)
+
+            if cache:
+                cache.put(key, scenarios['predicted_cpi'], model_info(automl, last_month, period, spec), lower, upper)
+
+        if lower is not None:
+            scenarios['lower_cpi'] = np.round(lower, 3)
+            scenarios['upper_cpi'] = np.round(upper, 3)
+
+        if args.scenario_out:
+            print(f"[{dt.datetime.now()}] Saving {len(scenarios)} scenarios to {args.scenario_out}")
+            with metrics.span("save", path=args.scenario_out):
+                scenarios.to_csv(args.scenario_out, index=False)
+        else:
+            print(scenarios.to_csv(index=False), end="")
+
+        metrics.finish()
+        quit()
+
+    if cached:
+        predictions = cached["predictions"]
+        lower, upper = cached.get("lower"), cached.get("upper")
     else:
-        res = df
-        res['predicted_cpi'] = np.nan
-        res.reset_index()
-        to_append = pd.DataFrame([[next_month.date(), np.nan, np.nan, prediction]], columns=list(res.columns))
-        res['timestamp'] = pd.to_datetime(res['timestamp']).dt.date
-        res = res._append(to_append, ignore_index=True)
-
-        res.to_csv(args.outfile, index=False)
-elif args.data_file:
-    res = input_df
-
-    to_append = pd.DataFrame([[next_month.date(), np.nan, np.nan, prediction]], columns=list(res.columns))
-    res = res._append(to_append, ignore_index=True)
-    res['timestamp'] = pd.to_datetime(res['timestamp']).dt.date
-    res.to_csv(args.data_file, index=False)
+        with metrics.span("predict", rows=len(X_test)):
+            predictions = predict(automl, future_features(df, X_test, spec) if spec else X_test)
+
+        lower = upper = None
+        if interval_spec:
+            lower, upper = prediction_intervals(predictions, errors, args.level)
+
+        if cache:
+            cache.put(key, predictions, model_info(automl, last_month, period, spec), lower, upper)
+
+    for i, (month, prediction) in enumerate(zip(X_test['timestamp'], predictions)):
+        if lower is None:
+            print(month, " cpi prediction:", prediction)
+        else:
+            print(month, " cpi prediction:", prediction, f" {args.level:.0%} interval: {lower[i]:.3f} - {upper[i]:.3f}")
+
+    #################################################
+
+
+        # save data
+
+
+    #################################################
+
+    try:
+        if args.outfile:
+            with metrics.span("save", path=args.outfile):
+                append_predictions(args.outfile, prediction_rows(X_test['timestamp'], predictions, lower, upper), df, args.fmt)
+        elif args.data_file:
+            with metrics.span("save", path=args.data_file):
+                append_predictions(args.data_file, prediction_rows(X_test['timestamp'], predictions, lower, upper), fmt=args.fmt)
+    except ValueError as e:
+        print(f"[{dt.datetime.now()}] Error: {e}")
+        quit(-1)
+
+    metrics.finish()
+
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Library core of the cpi-csi scripts. Load and merge monthly CPI and
+CSI data, validate data files and train FLAML models to predict CPI
+based on CSI without spawning the scripts.
+
+The names below are imported on first use, so importing cpicsi doesn't
+pay for pandas, sklearn or FLAML until they are needed.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "DATA_COLUMNS": "cpicsi.data",
+    "INTERVAL_COLUMNS": "cpicsi.data",
+    "load_series": "cpicsi.data",
+    "parse_months": "cpicsi.data",
+    "load_csi_values": "cpicsi.data",
+    "merge_cpi_csi": "cpicsi.data",
+    "unmatched_warnings": "cpicsi.data",
+    "join_months": "cpicsi.data",
+    "month_keys": "cpicsi.data",
+    "validate_data": "cpicsi.validate",
+    "validate_data_file": "cpicsi.validate",
+    "ValidationReport": "cpicsi.validate",
+    "read_data_file": "cpicsi.data",
+    "data_format": "cpicsi.data",
+    "write_data_file": "cpicsi.data",
+    "write_atomic": "cpicsi.data",
+    "prediction_rows": "cpicsi.data",
+    "append_predictions": "cpicsi.data",
+    "data_columns": "cpicsi.data",
+    "MonthlySeries": "cpicsi.series",
+    "is_monthly": "cpicsi.series",
+    "SharedFrame": "cpicsi.shared",
+    "AUTOML_SETTINGS": "cpicsi.model",
+    "train": "cpicsi.model",
+    "predict": "cpicsi.model",
+    "predict_scenarios": "cpicsi.model",
+    "ModelStore": "cpicsi.model",
+    "model_info": "cpicsi.model",
+    "worker_settings": "cpicsi.model",
+    "refit": "cpicsi.model",
+    "update_plan": "cpicsi.model",
+    "PredictionCache": "cpicsi.cache",
+    "prediction_key": "cpicsi.cache",
+    "PROFILES": "cpicsi.search",
+    "search_settings": "cpicsi.search",
+    "FEATURES": "cpicsi.features",
+    "feature_spec": "cpicsi.features",
+    "add_features": "cpicsi.features",
+    "future_features": "cpicsi.features",
+    "scenario_features": "cpicsi.features",
+    "FeatureStore": "cpicsi.features",
+    "member_errors": "cpicsi.intervals",
+    "prediction_intervals": "cpicsi.intervals",
+    "clean_csi": "cpicsi.clean",
+    "ingest": "cpicsi.ingest",
+    "run_backtest": "cpicsi.backtest",
+    "load_cpi_series": "cpicsi.multi",
+    "merge_series": "cpicsi.multi",
+    "forecast_series": "cpicsi.multi",
+    "append_forecasts": "cpicsi.multi",
+    "ForecastService": "cpicsi.serve",
+    "synthetic_series": "cpicsi.synthetic",
+    "write_synthetic_files": "cpicsi.synthetic",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'cpicsi' has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,71 @@
+import os
+import time
+import datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cpicsi.model import train, worker_settings
+from cpicsi.shared import SharedFrame
+
+#################################################
+
+
+    # rolling origin backtest
+
+
+#################################################
+
+def fit_origin(shared, origin, horizon, automl_settings):
+    """
+    Train on the rows of the SharedFrame before origin and score the
+    prediction of the next horizon rows. Runs in a worker process.
+    """
+    from sklearn.metrics import mean_absolute_percentage_error, r2_score
+
+    df = shared.frame()
+
+    train_df = df[:origin]
+    test_df = df[origin:origin + horizon]
+
+    start = time.perf_counter()
+    automl = train(train_df, period=horizon, **automl_settings)
+    fit_seconds = time.perf_counter() - start
+
+    y_test = test_df['cpi']
+    y_pred = automl.predict(test_df[['timestamp', 'csi']])
+
+    r2 = np.nan
+    if len(y_test) > 1:
+        r2 = r2_score(y_test, y_pred)
+
+    return {
+        'origin': test_df['timestamp'].iloc[0].date(),
+        'train_rows': len(train_df),
+        'mape': mean_absolute_percentage_error(y_test, y_pred),
+        'r2': r2,
+        'fit_seconds': fit_seconds,
+    }
+
+
+def run_backtest(df, horizon=12, min_train=120, step=1, jobs=None, **settings):
+    """
+    Walk the origin forward from min_train rows to the end of df in
+    steps of step rows, fitting every origin in its own process. The
+    workers map df from a SharedFrame instead of copying it. settings
+    override AUTOML_SETTINGS. Returns a data frame with the mape, r2
+    and fit time of every origin.
+    """
+    jobs = jobs or os.cpu_count()
+    origins = range(min_train, df.shape[0] - horizon + 1, step)
+
+    settings = worker_settings(settings)
+
+    print(f"[{dt.datetime.now()}] Backtesting {len(origins)} origins with {jobs} workers")
+
+    with SharedFrame(df) as shared, ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(fit_origin, shared, o, horizon, settings) for o in origins]
+        results = [f.result() for f in futures]
+
+    return pd.DataFrame(results, columns=['origin', 'train_rows', 'mape', 'r2', 'fit_seconds'])
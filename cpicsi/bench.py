@@ -0,0 +1,83 @@
+import os
+import platform
+import datetime as dt
+from importlib.metadata import version, PackageNotFoundError
+
+import numpy as np
+import pandas as pd
+
+from cpicsi.clean import clean_csi
+from cpicsi.data import load_series, merge_cpi_csi
+from cpicsi.validate import validate_data_file
+from cpicsi.synthetic import UNITS, synthetic_timestamps, write_synthetic_files
+from cpicsi.telemetry import Metrics
+
+#################################################
+
+
+    # timing the pipeline on synthetic data
+
+
+#################################################
+
+def bench_size(rows, directory, steps, horizon, seed, fmt, settings):
+    """
+    Generate the synthetic files of rows periods in directory and time
+    every step of the pipeline on them. Runs in its own process so the
+    peak memory is the one of this size.
+    """
+    print(f"[{dt.datetime.now()}] Generating {rows} rows in {directory}")
+    paths = write_synthetic_files(rows, directory, seed, fmt)
+    metrics = Metrics()
+
+    if "clean" in steps:
+        with metrics.span("clean"):
+            clean_csi(paths['csi_raw'], os.path.join(directory, 'csi_cleaned.csv'))
+
+    if "merge" in steps:
+        with metrics.span("merge"):
+            # long series are made of days, hours or minutes, not months
+            unit = UNITS[synthetic_timestamps(rows).freqstr]
+            merge_cpi_csi(load_series(paths['cpi']), load_series(paths['csi_clean']), unit=unit)
+
+    # fitting, predicting and plotting need the validated data
+    with metrics.span("validate"):
+        input_df, df, _ = validate_data_file(paths['data'], fmt)
+
+    if {"fit", "predict"} & set(steps):
+        from cpicsi.model import train, predict
+
+        with metrics.span("fit"):
+            automl = train(df, period=horizon, **settings)
+
+        X_test = pd.DataFrame({'timestamp': synthetic_timestamps(rows + horizon)[-horizon:],
+                               'csi': df['csi'].iloc[-horizon:].to_numpy()})
+
+        with metrics.span("predict"):
+            predictions = predict(automl, X_test)
+
+        input_df.loc[input_df.index[-horizon:], 'predicted_cpi'] = np.round(predictions, 3)
+
+    if "plot" in steps:
+        from cpicsi.plot import render_horizons
+
+        with metrics.span("plot"):
+            render_horizons(input_df, os.path.join(directory, 'img'), jobs=1)
+
+    return [(r['span'], r['seconds'], r['peak_rss_mb']) for r in metrics.records
+            if r['span'] in steps]
+
+
+def library_versions():
+    """
+    Versions of python and of the libraries that set the speed of the
+    pipeline.
+    """
+    found = [platform.python_version()]
+    for package in ["pandas", "flaml", "xgboost"]:
+        try:
+            found.append(version(package))
+        except PackageNotFoundError:
+            found.append("")
+
+    return found
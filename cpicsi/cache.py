@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import hashlib
+
+import pandas as pd
+
+from cpicsi.data import write_atomic
+from cpicsi.model import AUTOML_SETTINGS
+
+#################################################
+
+
+    # cached predictions
+
+
+#################################################
+
+# settings that change where the search logs, not what it finds
+LOG_SETTINGS = ["log_file_name", "log_type", "verbose"]
+
+
+def prediction_key(df, settings, period, months, csi_values, features=None, intervals=None):
+    """
+    Hash of the content of the merged series df (timestamp,cpi,csi), the
+    automl settings on top of AUTOML_SETTINGS, the period, the months
+    and csi to predict and the specs of the features and intervals. The
+    same data read from csv or parquet gets the same key.
+    """
+    series = pd.DataFrame({
+        'timestamp': pd.to_datetime(df['timestamp']),
+        'cpi': df['cpi'].astype('float64'),
+        'csi': df['csi'].astype('float64'),
+    })
+
+    automl_settings = {k: v for k, v in dict(AUTOML_SETTINGS, **settings).items()
+                       if k not in LOG_SETTINGS}
+
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+    h.update(json.dumps({
+        "settings": automl_settings,
+        "period": period,
+        "months": [str(pd.Timestamp(m).date()) for m in months],
+        "csi": [float(c) for c in csi_values],
+        "features": features,
+        "intervals": intervals,
+    }, sort_keys=True, default=str).encode())
+
+    return h.hexdigest()
+
+
+class PredictionCache:
+    """
+    Predictions and the metadata of the model that made them kept in
+    the json file at path, keyed by prediction_key. Holds at most
+    max_entries, the least recently used ones are dropped first. Runs
+    writing at the same time can lose each other's entries, never
+    corrupt the file.
+    """
+
+    def __init__(self, path, max_entries=256):
+        self.path = path
+        self.max_entries = max_entries
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except ValueError:
+            # a broken cache is only a miss
+            return {}
+
+    def save(self, entries):
+        if len(entries) > self.max_entries:
+            keep = sorted(entries, key=lambda k: entries[k]["used"])[-self.max_entries:]
+            entries = {k: entries[k] for k in keep}
+
+        write_atomic(self.path, json.dumps(entries).encode())
+
+    def get(self, key):
+        """
+        The cached entry with the predictions and model of key, None if
+        it isn't cached.
+        """
+        entries = self.load()
+
+        if key not in entries:
+            return None
+
+        entries[key]["used"] = time.time()
+        self.save(entries)
+        return entries[key]
+
+    def put(self, key, predictions, model, lower=None, upper=None):
+        """
+        Cache the predictions made for key, the bounds of their intervals
+        and the metadata of the model that made them.
+        """
+        entries = self.load()
+        entries[key] = {
+            "predictions": [float(p) for p in predictions],
+            "model": model,
+            "used": time.time(),
+        }
+
+        if lower is not None:
+            entries[key]["lower"] = [float(p) for p in lower]
+            entries[key]["upper"] = [float(p) for p in upper]
+        self.save(entries)
@@ -0,0 +1,42 @@
+import pandas as pd
+
+#################################################
+
+
+    # clean raw csi data
+
+
+#################################################
+
+def clean_csi(csi_path, outfile, column='Index', chunksize=100_000):
+    """
+    Clean the raw monthly csi table from the University of Michigan at
+    csi_path and save it to outfile with the columns csi,date . The
+    table is read and written chunksize rows at a time, column is the
+    index kept as csi when the table has more than one series. Raises
+    ValueError if the table doesn't have these columns.
+    """
+    # the first line is the title of the table, and the trailing comma
+    # of every line only adds an empty column that is never read
+    columns = pd.read_csv(csi_path, skiprows=1, nrows=0).columns
+    missing = [c for c in ['Month', 'Year', column] if c not in columns]
+
+    if missing:
+        raise ValueError(f"{csi_path} doesn't have the columns {', '.join(missing)}, it has {', '.join(c for c in columns if not c.startswith('Unnamed'))} .")
+
+    chunks = pd.read_csv(csi_path, skiprows=1, usecols=['Month', 'Year', column],
+                         chunksize=chunksize)
+
+    header = True
+
+    for chunk in chunks:
+        chunk = chunk.dropna(subset=['Month', 'Year'])
+        year = chunk['Year'].astype(int).astype(str)
+        month = chunk['Month'].astype(int).astype(str).str.zfill(2)
+        clean = pd.DataFrame({'csi': chunk[column], 'date': year + '-' + month + '-01'})
+
+        clean.to_csv(outfile, mode='w' if header else 'a', header=header, index=False)
+        header = False
+
+    if header:
+        pd.DataFrame(columns=['csi', 'date']).to_csv(outfile, index=False)
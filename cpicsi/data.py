@@ -0,0 +1,376 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+#################################################
+
+
+    # loading and merging the data
+
+
+#################################################
+
+DATA_COLUMNS = ['timestamp', 'cpi', 'csi', 'predicted_cpi']
+
+# bounds of the prediction interval, only in data files with intervals
+INTERVAL_COLUMNS = ['lower_cpi', 'upper_cpi']
+
+DATA_FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet', '.feather': 'feather'}
+
+
+def load_series(path):
+    """
+    Read a monthly cpi csv (observation_date,CPIAUCSL) or clean csi csv
+    (csi,date). Raises ValueError if the file has no rows.
+    """
+    df = pd.read_csv(path)
+
+    if len(df) < 1:
+        raise ValueError(f"{path} doesn't contain any rows.")
+
+    return df
+
+
+def parse_months(dates):
+    """
+    datetime64 values of the ISO 8601 dates, padded or not (1978-01-01,
+    1978-1-1), parsed once. Raises ValueError if one isn't a date.
+    """
+    try:
+        parsed = pd.to_datetime(pd.Series(dates), format='ISO8601')
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"The dates can't be parsed: {e}")
+
+    if parsed.isna().any():
+        raise ValueError(f"There are missing dates, the first one in row {int(np.argmax(parsed.isna())) + 1}.")
+
+    return parsed.to_numpy('datetime64[ns]')
+
+
+def month_keys(dates, unit='M'):
+    """
+    int64 keys of the months of the datetime64 dates, months since
+    1970-01, or of the periods of another numpy datetime unit.
+    """
+    return dates.astype(f'datetime64[{unit}]').astype('int64')
+
+
+def key_months(keys, unit='M'):
+    """
+    Start of the months, or periods of unit, of the keys, as datetime64.
+    """
+    return np.asarray(keys, dtype='int64').astype(f'datetime64[{unit}]').astype('datetime64[ns]')
+
+
+def timestamp_strings(dates):
+    """
+    ISO 8601 strings of the datetime64 dates, 1978-01-01, with the time
+    only if one of them has it. The model is trained on these, FLAML
+    runs several times slower per trial on datetime64 timestamps.
+    """
+    return pd.Series(dates).astype(str).to_numpy(object)
+
+
+def join_months(left, right, asof=False, names=("left", "right"), unit='M'):
+    """
+    Join the datetime64 dates left and right on their month by sorting
+    both once and searching the months of left in right. Every month
+    can only be once in left. In right too, unless asof is set, then
+    every month of left gets the last date of right in the same month,
+    like a preliminary csi released mid month, or the last day of a
+    daily series. Returns the positions in left and right of the
+    matched months, sorted by month, and the months of each side, by
+    its name in names, that have no match in the other. Raises
+    ValueError on repeated months. Series of days or hours, like the
+    synthetic ones of bench.py, are joined on those with unit.
+    """
+    left_order = np.argsort(left, kind='stable')
+    right_order = np.argsort(right, kind='stable')
+    left_keys = month_keys(left[left_order], unit)
+    right_keys = month_keys(right[right_order], unit)
+
+    for name, keys, repeats_ok in [(names[0], left_keys, False), (names[1], right_keys, asof)]:
+        repeated = keys[1:][keys[1:] == keys[:-1]]
+
+        if len(repeated) and not repeats_ok:
+            months = ', '.join(str(m) for m in np.unique(repeated).astype(f'datetime64[{unit}]')[:5])
+            raise ValueError(f"There are months repeated in the {name} data: {months}")
+
+    # last date of right in or before every month of left
+    pos = np.searchsorted(right_keys, left_keys, side='right') - 1
+    matched = (pos >= 0) & (right_keys[np.maximum(pos, 0)] == left_keys)
+
+    unmatched = {
+        names[0]: [str(m) for m in left_keys[~matched].astype(f'datetime64[{unit}]')],
+        names[1]: [str(m) for m in np.setdiff1d(right_keys, left_keys).astype(f'datetime64[{unit}]')],
+    }
+
+    return left_order[matched], right_order[pos[matched]], unmatched
+
+
+def load_csi_values(path):
+    """
+    The csi values in the csi column of the csv file at path, to predict
+    scenarios for. Raises ValueError if there is no csi column or a
+    value isn't a number.
+    """
+    df = pd.read_csv(path)
+
+    if 'csi' not in df.columns:
+        raise ValueError(f"{path} doesn't have a csi column.")
+
+    values = pd.to_numeric(df['csi'], errors='coerce')
+
+    if values.isna().any():
+        raise ValueError(f"The csi column of {path} has a value that isn't a number in row {int(np.argmax(values.isna())) + 2}.")
+
+    return values.to_list()
+
+
+def merge_cpi_csi(df_cpi, df_csi, asof=False, unit='M'):
+    """
+    Join the cpi and csi series on their month and return a data frame
+    with the columns timestamp,cpi,csi, timestamp being the first day of
+    the month as an ISO string. The dates are parsed once and joined on int64 month keys,
+    see join_months for asof and unit. The months of the cpi and csi
+    without a match are kept in attrs["unmatched"].
+    """
+    df_cpi = df_cpi.rename(columns = {'observation_date': 'date', 'CPIAUCSL': 'cpi'})
+
+    cpi_dates = parse_months(df_cpi['date'])
+    left, right, unmatched = join_months(cpi_dates, parse_months(df_csi['date']), asof, ("cpi", "csi"), unit)
+
+    df = pd.DataFrame({
+        'timestamp': timestamp_strings(key_months(month_keys(cpi_dates[left], unit), unit)),
+        'cpi': df_cpi['cpi'].to_numpy()[left],
+        'csi': df_csi['csi'].to_numpy()[right],
+    })
+    df.attrs["unmatched"] = unmatched
+    return df
+
+
+def unmatched_warnings(df):
+    """
+    Warnings about the months of the cpi and csi that merge_cpi_csi
+    couldn't match.
+    """
+    warnings = []
+
+    for name, months in df.attrs.get("unmatched", {}).items():
+        if months:
+            warnings.append(f"""{len(months)} months of the {name} data have no match and were
+    left out, the first one is {months[0]}.""")
+
+    return warnings
+
+
+def data_columns(columns):
+    """
+    Columns of a data file with columns, DATA_COLUMNS followed by
+    INTERVAL_COLUMNS if it has any of them.
+    """
+    if any(c in columns for c in INTERVAL_COLUMNS):
+        return DATA_COLUMNS + INTERVAL_COLUMNS
+
+    return DATA_COLUMNS
+
+
+def data_format(path, fmt=None):
+    """
+    Storage format of the data file at path, fmt if it is given or else
+    guessed from the extension. Unknown extensions are read as csv.
+    """
+    if fmt:
+        if fmt not in DATA_FORMATS.values():
+            raise ValueError(f"Unknown data file format {fmt}, use csv, parquet or feather.")
+        return fmt
+
+    return DATA_FORMATS.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+def read_data_file(path, fmt=None):
+    """
+    Read a data file stored as csv, parquet or feather. The binary
+    formats keep typed datetime64 timestamps and float64 columns and
+    need pyarrow installed.
+    """
+    fmt = data_format(path, fmt)
+
+    if fmt == 'csv':
+        return pd.read_csv(path)
+
+    try:
+        if fmt == 'parquet':
+            return pd.read_parquet(path)
+        return pd.read_feather(path)
+    except ImportError as e:
+        raise ValueError(f"Reading {fmt} data files requires pyarrow: {e}")
+
+
+def file_mode(path):
+    """
+    Permissions for the file written at path, the ones of the file it
+    replaces or else the default ones for a new file.
+    """
+    if os.path.exists(path):
+        return os.stat(path).st_mode & 0o777
+
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def write_atomic(path, data):
+    """
+    Write data to path through a temporary file next to it that is then
+    renamed, so readers never see half of it. data is bytes or a
+    function that writes to the binary file it is given.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            if callable(data):
+                data(f)
+            else:
+                f.write(data)
+        os.chmod(tmp, file_mode(path))
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def write_data_file(df, path, fmt=None):
+    """
+    Write the data file df (timestamp,cpi,csi,predicted_cpi and maybe
+    lower_cpi,upper_cpi) to path as csv, parquet or feather. The file is
+    written next to path first and then renamed, so readers never see
+    half of it.
+    """
+    fmt = data_format(path, fmt)
+
+    df = df.reset_index(drop=True).astype({c: 'float64' for c in df.columns if c != 'timestamp'})
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+
+    def write(f):
+        if fmt == 'csv':
+            # pandas leaves out the time when every timestamp is at midnight
+            df.to_csv(f, index=False)
+        elif fmt == 'parquet':
+            df.to_parquet(f, index=False)
+        else:
+            df.to_feather(f)
+
+    try:
+        write_atomic(path, write)
+    except ImportError as e:
+        raise ValueError(f"Writing {fmt} data files requires pyarrow: {e}")
+
+
+#################################################
+
+
+    # saving predictions
+
+
+#################################################
+
+def prediction_rows(timestamps, predictions, lower=None, upper=None):
+    """
+    Rows for the data file with the predicted cpi of future months, and
+    the bounds of its interval if they are given.
+    """
+    rows = pd.DataFrame({
+        'timestamp': pd.to_datetime(pd.Series(timestamps)).dt.date,
+        'cpi': np.nan,
+        'csi': np.nan,
+        'predicted_cpi': np.round(predictions, 3),
+    })
+
+    if lower is not None:
+        rows['lower_cpi'] = np.round(lower, 3)
+        rows['upper_cpi'] = np.round(upper, 3)
+
+    return rows
+
+
+def read_tail(path, size=4096):
+    """
+    The header and the last row of the csv file at path, without
+    reading the rest of it. The last row is None if there are no rows.
+    """
+    with open(path, 'rb') as f:
+        header = f.readline().decode().strip()
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        f.seek(max(end - size, 0))
+        tail = f.read().decode()
+
+    last = tail.rstrip('\n').rsplit('\n', 1)[-1].strip()
+
+    if last == header:
+        last = None
+
+    return header, last, tail.endswith('\n')
+
+
+def append_predictions(path, to_append, df=None, fmt=None):
+    """
+    Append the prediction rows to the data file at path. For csv files
+    only the header and the last row of an existing file are checked,
+    and the rows are added with a single O_APPEND write so the file is
+    never rewritten. Binary files and new files are written whole and
+    atomically, new files start with the past data in df. Rows with
+    interval bounds turn a file without them into one with them, the
+    only time a csv file is rewritten.
+    """
+    fmt = data_format(path, fmt)
+
+    if not os.path.exists(path):
+        res = df.copy()
+        res['predicted_cpi'] = np.nan
+        res = pd.concat([res, to_append], ignore_index=True)
+        write_data_file(res[data_columns(res.columns)], path, fmt)
+        return
+
+    if fmt != 'csv':
+        res = read_data_file(path, fmt)
+
+        if list(res.columns) != data_columns(res.columns):
+            raise ValueError("""File doesn't contain necessary columns:
+
+              timestamp,cpi,csi,predicted_cpi""")
+
+        res = pd.concat([res, to_append], ignore_index=True)
+        write_data_file(res[data_columns(res.columns)], path, fmt)
+        return
+
+    header, last, newline = read_tail(path)
+    columns = header.split(',')
+
+    if columns != data_columns(columns):
+        raise ValueError("""File doesn't contain necessary columns:
+
+              timestamp,cpi,csi,predicted_cpi""")
+
+    if last is not None and len(last.split(',')) != len(columns):
+        raise ValueError(f"""The last row of the file doesn't have the columns
+    {header} . Last row: {last}""")
+
+    if len(data_columns(to_append.columns)) > len(columns):
+        res = pd.concat([read_data_file(path, fmt), to_append], ignore_index=True)
+        write_data_file(res[data_columns(res.columns)], path, fmt)
+        return
+
+    rows = to_append.reindex(columns=columns).to_csv(header=False, index=False)
+
+    if not newline:
+        rows = '\n' + rows
+
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+    try:
+        os.write(fd, rows.encode())
+    finally:
+        os.close(fd)
@@ -0,0 +1,160 @@
+import os
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from cpicsi.data import write_atomic
+
+#################################################
+
+
+    # lag and rolling features
+
+
+#################################################
+
+FEATURES = {
+    "csi_lags": [1, 2, 3, 12],
+    "csi_windows": [3, 6, 12],
+    "cpi_lags": [1, 2, 3, 12],
+}
+
+
+def feature_spec(period=1, spec=None):
+    """
+    The features of spec, FEATURES by default, that are known when
+    predicting period months ahead. The cpi of the months being
+    predicted is not known, so only cpi lags of period months or more
+    are kept.
+    """
+    spec = dict(spec or FEATURES)
+    spec["cpi_lags"] = [k for k in spec["cpi_lags"] if k >= period]
+    return spec
+
+
+def lookback(spec):
+    """
+    Number of months before a month that its features depend on.
+    """
+    return max([1] + spec["csi_lags"] + [w - 1 for w in spec["csi_windows"]] + spec["cpi_lags"])
+
+
+def add_features(df, spec):
+    """
+    df (timestamp,cpi,csi) with the columns of the features in spec:
+    csi lags, rolling means of the csi ending in every month, the change
+    of the csi from the month before and cpi lags. Months without enough
+    history get NaN features.
+    """
+    csi = df['csi'].astype('float64')
+    cpi = df['cpi'].astype('float64')
+
+    features = {'csi_delta': csi.diff()}
+
+    for k in spec["csi_lags"]:
+        features[f'csi_lag{k}'] = csi.shift(k)
+
+    # every window is summed on its own instead of as a running sum, so
+    # the means of a month are the same computed whole or incrementally
+    for w in spec["csi_windows"]:
+        means = np.full(len(csi), np.nan)
+        if len(csi) >= w:
+            means[w - 1:] = sliding_window_view(csi.to_numpy(), w).mean(axis=1)
+        features[f'csi_mean{w}'] = pd.Series(means, index=csi.index)
+
+    for k in spec["cpi_lags"]:
+        features[f'cpi_lag{k}'] = cpi.shift(k)
+
+    return pd.concat([df.reset_index(drop=True), pd.DataFrame(features).reset_index(drop=True)], axis=1)
+
+
+def future_features(history, X_test, spec):
+    """
+    Features of the months in X_test (timestamp,csi) following history
+    (timestamp,cpi,csi). Only the last months of history are used.
+    """
+    tail = history[['timestamp', 'cpi', 'csi']].iloc[-lookback(spec):]
+    future = X_test[['timestamp', 'csi']].assign(cpi=np.nan)
+
+    df = add_features(pd.concat([tail, future], ignore_index=True), spec)
+    return df.iloc[len(tail):].drop(columns='cpi').reset_index(drop=True)
+
+
+def scenario_features(history, month, csi_values, spec):
+    """
+    Features of month for every csi in csi_values, one row per csi.
+    """
+    rows = [future_features(history, pd.DataFrame({'timestamp': [month], 'csi': [c]}), spec)
+            for c in csi_values]
+    return pd.concat(rows, ignore_index=True)
+
+
+#################################################
+
+
+    # cached features
+
+
+#################################################
+
+class FeatureStore:
+    """
+    Features of the data kept in the pickle at path, PREFIX.features.pkl
+    next to the model store. When new months are added at the end of
+    the data, only their features are computed from the last months
+    before them.
+    """
+
+    def __init__(self, path):
+        self.pkl = path
+
+    def load(self, spec):
+        """
+        The stored features if they were computed with spec.
+        """
+        if not os.path.exists(self.pkl):
+            return None
+
+        cached = pd.read_pickle(self.pkl)
+
+        if cached.attrs.get("spec") != spec:
+            return None
+
+        return cached
+
+    def features(self, df, spec):
+        """
+        df (timestamp,cpi,csi) with the features of spec, computed only
+        for the months that are not stored yet. Returns the features and
+        the number of months computed.
+        """
+        df = df[['timestamp', 'cpi', 'csi']].reset_index(drop=True)
+        cached = self.load(spec)
+        n = 0
+
+        if cached is not None and len(cached) <= len(df):
+            n = len(cached)
+            old = df.iloc[:n]
+
+            # the stored months have to be the same as the first ones
+            same = (old['timestamp'].astype(str).to_numpy() == cached['timestamp'].astype(str).to_numpy()).all() \
+                and np.array_equal(old[['cpi', 'csi']].to_numpy('float64'),
+                                   cached[['cpi', 'csi']].to_numpy('float64'), equal_nan=True)
+
+            if not same:
+                n = 0
+
+        if n == 0:
+            result = add_features(df, spec)
+        else:
+            start = max(n - lookback(spec), 0)
+            new = add_features(df.iloc[start:], spec).iloc[n - start:]
+            result = pd.concat([cached, new], ignore_index=True)
+
+        result.attrs["spec"] = spec
+
+        if n < len(df) or cached is None:
+            write_atomic(self.pkl, result.to_pickle)
+
+        return result, len(df) - n
@@ -0,0 +1,221 @@
+import os
+import json
+import asyncio
+import hashlib
+import datetime as dt
+import urllib.request
+from urllib.error import HTTPError
+
+import pandas as pd
+
+from cpicsi.clean import clean_csi
+from cpicsi.data import DATA_COLUMNS, data_columns, load_series, merge_cpi_csi, unmatched_warnings, read_data_file, write_data_file, write_atomic
+
+#################################################
+
+
+    # fetching the sources into a local mirror
+
+
+#################################################
+
+# the csi is also published on FRED, the raw table of the University of
+# Michigan can be used instead with --source csi=URL
+SOURCES = {
+    "cpi": "https://fred.stlouisfed.org/graph/fredgraph.csv?id=CPIAUCSL",
+    "csi": "https://fred.stlouisfed.org/graph/fredgraph.csv?id=UMCSENT",
+}
+
+
+class Mirror:
+    """
+    Raw files of the sources kept in directory as NAME.raw with the
+    headers needed to ask for them again only if they changed in
+    NAME.json .
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def raw(self, name):
+        return os.path.join(self.directory, f"{name}.raw")
+
+    def meta(self, name):
+        path = os.path.join(self.directory, f"{name}.json")
+
+        if not os.path.exists(path) or not os.path.exists(self.raw(name)):
+            return {}
+
+        with open(path) as f:
+            return json.load(f)
+
+    def save(self, name, data, meta):
+        write_atomic(self.raw(name), data)
+        write_atomic(os.path.join(self.directory, f"{name}.json"), json.dumps(meta, indent=4).encode())
+
+
+def fetch(mirror, name, url, timeout=30):
+    """
+    Download url into the mirror as name with a conditional request.
+    Returns True if the file changed since the last fetch.
+    """
+    meta = mirror.meta(name)
+    headers = {"User-Agent": "cpi-csi"}
+
+    # a new url is always fetched again
+    if meta.get("url") == url:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as res:
+            data = res.read()
+            etag = res.headers.get("ETag")
+            last_modified = res.headers.get("Last-Modified")
+    except HTTPError as e:
+        if e.code == 304:
+            print(f"[{dt.datetime.now()}] {name} not modified since {meta.get('fetched')}")
+            return False
+        raise
+
+    sha256 = hashlib.sha256(data).hexdigest()
+    changed = sha256 != meta.get("sha256")
+
+    mirror.save(name, data, {
+        "url": url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "sha256": sha256,
+        "fetched": dt.datetime.now().isoformat(timespec="seconds"),
+    })
+
+    print(f"[{dt.datetime.now()}] Fetched {name} from {url}, {len(data)} bytes, {'changed' if changed else 'unchanged'}")
+    return changed
+
+
+async def fetch_all(mirror, sources, timeout=30):
+    """
+    Fetch every source (name: url) at the same time. Returns the names
+    of the sources that changed.
+    """
+    changed = await asyncio.gather(*[asyncio.to_thread(fetch, mirror, name, url, timeout)
+                                     for name, url in sources.items()])
+    return [name for name, c in zip(sources, changed) if c]
+
+
+#################################################
+
+
+    # cleaning and merging what changed
+
+
+#################################################
+
+def read_fred_series(raw_path, name):
+    """
+    The FRED csv at raw_path (observation_date,SERIES) without the
+    months FRED has no value for, written as a dot. Raises ValueError
+    if it doesn't have these two columns or a value isn't a number.
+    """
+    df = pd.read_csv(raw_path, na_values='.')
+
+    if list(df.columns[:1]) != ['observation_date'] or df.shape[1] != 2:
+        raise ValueError(f"""The {name} source should have the columns observation_date and the
+    values of one series, it has {','.join(map(str, df.columns))} .""")
+
+    df = df.dropna()
+
+    if not pd.api.types.is_numeric_dtype(df[df.columns[1]]):
+        raise ValueError(f"The {name} source has values that aren't numbers in the {df.columns[1]} column.")
+
+    return df
+
+
+def load_cpi_source(raw_path):
+    """
+    The cpi at raw_path, from CPIAUCSL or any other series of FRED, with
+    the columns observation_date,CPIAUCSL that merge_cpi_csi takes.
+    """
+    df = read_fred_series(raw_path, "cpi")
+    df = df.rename(columns={df.columns[1]: 'CPIAUCSL'})
+
+    if len(df) < 1:
+        raise ValueError(f"{raw_path} doesn't contain any rows.")
+
+    return df
+
+
+def clean_csi_source(raw_path, outfile):
+    """
+    Clean the raw csi at raw_path to outfile (csi,date), from the
+    UMCSENT series of FRED or the raw table of the University of
+    Michigan.
+    """
+    with open(raw_path) as f:
+        header = f.readline().strip().split(',')
+
+    if header[0] != 'observation_date':
+        clean_csi(raw_path, outfile)
+        return
+
+    df = read_fred_series(raw_path, "csi")
+    df = df.rename(columns={df.columns[0]: 'date', df.columns[1]: 'csi'})
+    df[['csi', 'date']].to_csv(outfile, index=False)
+
+
+def update_data_file(df, path, fmt=None):
+    """
+    Write the merged series df (timestamp,cpi,csi) as the data file at
+    path, keeping the predicted cpi and its interval of the months
+    already in it and the rows predicted for months that df doesn't have
+    yet.
+    """
+    df = df.assign(timestamp=pd.to_datetime(df['timestamp']))
+
+    if os.path.exists(path):
+        old = read_data_file(path, fmt)
+        old['timestamp'] = pd.to_datetime(old['timestamp'])
+        predicted = old.dropna(subset=['predicted_cpi'])
+        columns = data_columns(old.columns)
+
+        df = df.merge(predicted[['timestamp'] + columns[3:]], on='timestamp', how='left')
+        rest = predicted[~predicted['timestamp'].isin(df['timestamp'])]
+        df = pd.concat([df, rest], ignore_index=True).sort_values('timestamp', kind='stable')
+    else:
+        columns = DATA_COLUMNS
+        df['predicted_cpi'] = float('nan')
+
+    write_data_file(df[columns], path, fmt)
+
+
+def ingest(sources=None, mirror_dir="mirror", outfile="data.csv", fmt=None, force=False, timeout=30):
+    """
+    Fetch the cpi and csi sources concurrently into mirror_dir and,
+    only if one of them changed or force is set, clean the csi and merge
+    both into the data file outfile. Returns the names of the sources
+    that changed.
+    """
+    sources = dict(SOURCES, **(sources or {}))
+    mirror = Mirror(mirror_dir)
+
+    changed = asyncio.run(fetch_all(mirror, sources, timeout))
+
+    if not changed and not force and os.path.exists(outfile):
+        print(f"[{dt.datetime.now()}] No source changed, {outfile} is up to date")
+        return changed
+
+    csi_clean = os.path.join(mirror_dir, "csi_clean.csv")
+    clean_csi_source(mirror.raw("csi"), csi_clean)
+
+    df = merge_cpi_csi(load_cpi_source(mirror.raw("cpi")), load_series(csi_clean))
+
+    for warning in unmatched_warnings(df):
+        print(f"[{dt.datetime.now()}] Warning: {warning}")
+
+    print(f"[{dt.datetime.now()}] Saving {len(df)} months to {outfile}")
+    update_data_file(df, outfile, fmt)
+
+    return changed
@@ -0,0 +1,73 @@
+import os
+import datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cpicsi.model import train, worker_settings
+from cpicsi.shared import SharedFrame
+
+#################################################
+
+
+    # prediction intervals
+
+
+#################################################
+
+def fit_member(shared, origin, period, settings):
+    """
+    Train on the rows of the SharedFrame before origin and return the
+    relative error, actual / predicted - 1, of the prediction of the
+    next period rows. Runs in a worker process.
+    """
+    df = shared.frame()
+    train_df = df.iloc[:origin]
+    test_df = df.iloc[origin:origin + period]
+
+    automl = train(train_df, period=period, **settings)
+    y_pred = np.asarray(automl.predict(test_df.drop(columns='cpi')), dtype='float64')
+
+    return test_df['cpi'].to_numpy('float64') / y_pred - 1
+
+
+def member_errors(df, automl, period=1, members=20, jobs=None, **settings):
+    """
+    Relative errors of an ensemble of members models with the best
+    estimator and config of automl, every one trained on df up to one of
+    the last members months and scored on the period months after it.
+    The members are trained in parallel, one process each, mapping df
+    from a SharedFrame. Returns an array with one row per member and
+    one column per month ahead.
+    """
+    jobs = jobs or os.cpu_count()
+    last = df.shape[0] - period
+    origins = range(max(last - members + 1, 1), last + 1)
+
+    if len(origins) < 2:
+        raise ValueError(f"There are not enough months to train {members} members predicting {period} months.")
+
+    # the members only refit the config that was found, without searching
+    settings = dict(worker_settings(settings), time_budget=-1, max_iter=1,
+                    estimator_list=[automl.best_estimator],
+                    starting_points={automl.best_estimator: automl.best_config})
+
+    print(f"[{dt.datetime.now()}] Training {len(origins)} ensemble members with {jobs} workers")
+
+    with SharedFrame(df) as shared, ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(fit_member, shared, o, period, settings) for o in origins]
+        return np.array([f.result() for f in futures])
+
+
+def prediction_intervals(predictions, errors, level=0.9):
+    """
+    Lower and upper bounds of the interval with probability level around
+    every prediction, from the quantiles of the ensemble errors of the
+    same month ahead. Predictions of the same month, like scenarios, all
+    use the errors of the first month ahead.
+    """
+    predictions = np.asarray(predictions, dtype='float64')
+    steps = np.minimum(np.arange(len(predictions)), errors.shape[1] - 1)
+
+    low, high = np.quantile(errors, [(1 - level) / 2, (1 + level) / 2], axis=0)
+    return predictions * (1 + low[steps]), predictions * (1 + high[steps])
@@ -0,0 +1,241 @@
+import os
+import json
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from cpicsi.data import write_atomic
+
+#################################################
+
+
+    # training and predicting
+
+
+#################################################
+
+AUTOML_SETTINGS = {
+    "time_budget": 1,
+    "metric": "mape",
+    "task": "ts_forecast",
+    "log_file_name": "cpi-csi.log",
+    "eval_method": "holdout",
+    "log_type": "all",
+    "label": "cpi",
+    "estimator_list": ["xgboost"],
+}
+
+
+def train(df, period=1, starting_points=None, **settings):
+    """
+    Search and fit a model on df (timestamp,cpi,csi) that predicts the
+    following period months. settings override AUTOML_SETTINGS.
+    """
+    from flaml import AutoML
+
+    automl_settings = dict(AUTOML_SETTINGS, **settings)
+
+    if starting_points:
+        automl_settings["starting_points"] = starting_points
+
+    automl = AutoML()
+    automl.fit(dataframe=df, **automl_settings, period=period)
+    return automl
+
+
+def worker_settings(settings):
+    """
+    settings for a fit in a worker process. Every worker already gets
+    its own core and they can't share a log.
+    """
+    return dict(settings, n_jobs=1, verbose=0, log_file_name="")
+
+
+def refit(df, estimator, config, period=1, **settings):
+    """
+    Fit estimator with the hyperparameters in config on df without
+    searching, a single fit that costs the same however long the search
+    was. The model isn't validated, its best_loss is inf. settings
+    override AUTOML_SETTINGS.
+    """
+    settings = dict(settings, time_budget=-1, max_iter=1, estimator_list=[estimator])
+    return train(df, period=period, starting_points={estimator: config}, **settings)
+
+
+def predict(automl, X_test):
+    """
+    Predict the cpi of the consecutive months in X_test (timestamp,csi).
+    """
+    return automl.predict(X_test).to_list()
+
+
+def predict_scenarios(automl, month, csi_values, X_test=None):
+    """
+    Predict the cpi of a single month for every csi in csi_values.
+    X_test has the rows to predict when the model was trained with more
+    features than the csi. Returns a data frame with the columns
+    timestamp,csi,predicted_cpi .
+    """
+    if X_test is None:
+        X_test = pd.DataFrame({'timestamp' : pd.Timestamp(month), 'csi' : csi_values})
+
+    # FLAML reads the rows of X_test as consecutive months, so every
+    # scenario is predicted on its own from the same fitted model.
+    predictions = [automl.predict(X_test.iloc[[i]]).to_list()[0] for i in range(len(X_test))]
+
+    scenarios = X_test[['timestamp', 'csi']].assign(predicted_cpi=[round(p, 3) for p in predictions])
+    scenarios['timestamp'] = pd.to_datetime(scenarios['timestamp']).dt.date
+    return scenarios
+
+
+#################################################
+
+
+    # model store
+
+
+#################################################
+
+def model_info(automl, trained_until, period=1, features=None, searched_until=None, best_loss=None):
+    """
+    Metadata and best config of a fitted model, as stored in json.
+    features is the spec of the features it was trained with and
+    searched_until the last month of the data of the last full search,
+    trained_until by default. A refitted model isn't validated, so it
+    keeps the best_loss of that search.
+    """
+    return {
+        "trained_until": str(pd.Timestamp(trained_until).date()),
+        "searched_until": str(pd.Timestamp(searched_until or trained_until).date()),
+        "period": period,
+        "features": features,
+        "best_estimator": automl.best_estimator,
+        "best_config": automl.best_config,
+        "best_loss": automl.best_loss if best_loss is None else best_loss,
+    }
+
+
+class ModelStore:
+    """
+    Fitted model and best config kept as PREFIX.model.pkl and
+    PREFIX.model.json, usually next to the data file. Cached predictions
+    are kept as PREFIX.cache.json and features as PREFIX.features.pkl .
+    Both files are replaced atomically and the pickle holds a copy of
+    the json, so a run saving at the same time is never half read and a
+    pickle that doesn't match its json is not used.
+    """
+
+    def __init__(self, path):
+        self.prefix = os.path.splitext(path)[0]
+        self.pkl = self.prefix + ".model.pkl"
+        self.json = self.prefix + ".model.json"
+        self.cache = self.prefix + ".cache.json"
+        self.features = self.prefix + ".features.pkl"
+
+    def load_info(self):
+        """
+        The stored config and metadata, None if nothing is stored.
+        """
+        if not os.path.exists(self.json):
+            return None
+
+        with open(self.json) as f:
+            return json.load(f)
+
+    def load(self, trained_until=None, period=1, features=None):
+        """
+        The stored model and its metadata if it was trained up to the
+        month trained_until, or up to any month if it is None, for the
+        same period and features, otherwise None, None.
+        """
+        info = self.load_info()
+
+        if not info or (trained_until is not None
+                        and info["trained_until"] != str(pd.Timestamp(trained_until).date())) \
+                or info.get("period", 1) != period or info.get("features") != features \
+                or not os.path.exists(self.pkl):
+            return None, None
+
+        with open(self.pkl, "rb") as f:
+            stored = pickle.load(f)
+
+        # another run saved a new model between reading the json and the pickle
+        if not isinstance(stored, dict) or stored.get("info") != info:
+            return None, None
+
+        return stored["automl"], info
+
+    def load_model(self, trained_until=None, period=1, features=None):
+        """
+        The stored model if it matches like in load, otherwise None.
+        """
+        return self.load(trained_until, period, features)[0]
+
+    def starting_points(self):
+        """
+        Best config of the stored model to warm start a search with.
+        """
+        info = self.load_info()
+
+        if not info:
+            return None
+
+        return {info["best_estimator"]: info["best_config"]}
+
+    def save(self, automl, trained_until, period=1, features=None, searched_until=None, best_loss=None):
+        info = json.loads(json.dumps(model_info(automl, trained_until, period, features, searched_until, best_loss)))
+
+        write_atomic(self.pkl, pickle.dumps({"info": info, "automl": automl}))
+        write_atomic(self.json, json.dumps(info, indent=4).encode())
+
+
+#################################################
+
+
+    # updating a stored model
+
+
+#################################################
+
+def months_between(start, end):
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    return (end.year - start.year) * 12 + end.month - start.month
+
+
+def update_plan(info, automl, df, refit_every=12, drift=3.0):
+    """
+    Whether the stored model (automl and its info) trained on the first
+    months of df can be updated with the months after it by refitting
+    its config, or needs a full search. A full search is needed every
+    refit_every months after the last one, or when the mean absolute
+    percentage error of the stored model on the new months is more than
+    drift times its validation loss, or it has none. Only the first
+    period new months are scored, the ones the stored model can
+    predict. Returns the plan, update or search, the reason and that
+    error.
+    """
+    new = df[pd.to_datetime(df['timestamp']) > pd.Timestamp(info["trained_until"])]
+
+    if len(new) < 1:
+        return "update", "no new months", 0.0
+
+    # the stored model predicts at most period months after its history
+    scored = new.iloc[:info["period"]]
+    y_pred = np.asarray(automl.predict(scored.drop(columns='cpi')), dtype='float64')
+    # the same mape as the loss of FLAML, |predicted - actual| / |actual|
+    error = float(np.mean(np.abs(y_pred / scored['cpi'].to_numpy('float64') - 1)))
+
+    since = months_between(info.get("searched_until", info["trained_until"]), new['timestamp'].iloc[-1])
+
+    if since >= refit_every:
+        return "search", f"{since} months since the last search", error
+
+    # a search of a single trial reports an infinite loss
+    if not np.isfinite(info["best_loss"]):
+        return "search", "the stored model has no validation loss", error
+
+    if error > drift * info["best_loss"]:
+        return "search", f"error {error:.4f} on {len(scored)} new months is over {drift} times the loss {info['best_loss']:.4f}", error
+
+    return "update", f"error {error:.4f} on {len(scored)} of {len(new)} new months", error
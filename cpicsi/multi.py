@@ -0,0 +1,149 @@
+import os
+import datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cpicsi.data import parse_months, month_keys, key_months, join_months, timestamp_strings, read_tail
+from cpicsi.model import train, predict, predict_scenarios, worker_settings
+from cpicsi.shared import SharedFrame
+
+#################################################
+
+
+    # many cpi series against the csi
+
+
+#################################################
+
+LONG_COLUMNS = ['series_id', 'value']
+
+FORECAST_COLUMNS = ['series', 'timestamp', 'csi', 'predicted_cpi', 'train_rows', 'best_loss']
+
+
+def load_cpi_series(path):
+    """
+    Read a file of many monthly FRED series, wide with an
+    observation_date column and one column per series, or long with the
+    columns observation_date (or date),series_id,value . Returns a wide
+    data frame with a date column and one column per series. Raises
+    ValueError if the file has no rows or series.
+    """
+    df = pd.read_csv(path)
+
+    if len(df) < 1:
+        raise ValueError(f"{path} doesn't contain any rows.")
+
+    df = df.rename(columns={'observation_date': 'date'})
+
+    if 'date' not in df.columns:
+        raise ValueError(f"{path} doesn't have an observation_date or date column.")
+
+    if set(LONG_COLUMNS) <= set(df.columns):
+        df = df.pivot(index='date', columns='series_id', values='value').reset_index()
+        df.columns.name = None
+
+    if df.shape[1] < 2:
+        raise ValueError(f"{path} doesn't contain any series.")
+
+    return df
+
+
+def merge_series(df_cpi, df_csi, asof=False):
+    """
+    Join every cpi series in the wide df_cpi with the csi on their month
+    in a single sorted join, like merge_cpi_csi. Returns a data frame
+    with the columns timestamp, csi and one column per series, and the
+    months without a match in attrs["unmatched"].
+    """
+    cpi_dates = parse_months(df_cpi['date'])
+    left, right, unmatched = join_months(cpi_dates, parse_months(df_csi['date']), asof, ("cpi", "csi"))
+
+    df = df_cpi.drop(columns='date').iloc[left].reset_index(drop=True)
+    df.insert(0, 'csi', df_csi['csi'].to_numpy()[right])
+    df.insert(0, 'timestamp', timestamp_strings(key_months(month_keys(cpi_dates[left]))))
+    df.attrs["unmatched"] = unmatched
+    return df
+
+
+def forecast_one(shared, name, csi_values, horizon_csi, settings):
+    """
+    Train on the series name of the merged data in the SharedFrame and
+    predict the month after its last value for every csi in csi_values,
+    or the following months with horizon_csi. Runs in a worker process.
+    """
+    df = shared.frame()
+    series_df = df[['timestamp', name, 'csi']].rename(columns={name: 'cpi'}).dropna(subset=['cpi'])
+    next_month = pd.to_datetime(series_df['timestamp'].max()) + pd.DateOffset(months=1)
+
+    if horizon_csi:
+        months = pd.date_range(next_month, periods=len(horizon_csi), freq='MS')
+        X_test = pd.DataFrame({'timestamp': months, 'csi': horizon_csi})
+
+        automl = train(series_df, period=len(horizon_csi), **settings)
+        forecast = X_test.assign(predicted_cpi=np.round(predict(automl, X_test), 3))
+        forecast['timestamp'] = forecast['timestamp'].dt.date
+    else:
+        automl = train(series_df, **settings)
+        forecast = predict_scenarios(automl, next_month, csi_values)
+
+    forecast.insert(0, 'series', name)
+    forecast['train_rows'] = len(series_df)
+    forecast['best_loss'] = automl.best_loss
+    return forecast
+
+
+def append_forecasts(path, forecasts):
+    """
+    Append the forecasts of forecast_series to the csv file at path, or
+    create it. Only the header and the last row of an existing file are
+    checked, like append_predictions does for data files, and the rows
+    are added with a single O_APPEND write. Raises ValueError if the
+    file doesn't have the columns of the forecasts.
+    """
+    if not os.path.exists(path):
+        forecasts.to_csv(path, columns=FORECAST_COLUMNS, index=False)
+        return
+
+    header, last, newline = read_tail(path)
+
+    if header.split(',') != FORECAST_COLUMNS:
+        raise ValueError(f"""{path} doesn't have the columns of the forecasts:
+
+              {','.join(FORECAST_COLUMNS)}""")
+
+    if last is not None and len(last.split(',')) != len(FORECAST_COLUMNS):
+        raise ValueError(f"""The last row of {path} doesn't have the columns
+    {header} . Last row: {last}""")
+
+    rows = forecasts.to_csv(columns=FORECAST_COLUMNS, header=False, index=False)
+
+    if not newline:
+        rows = '\n' + rows
+
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+    try:
+        os.write(fd, rows.encode())
+    finally:
+        os.close(fd)
+
+
+def forecast_series(df, series, csi_values=None, horizon_csi=None, jobs=None, **settings):
+    """
+    Train and predict every column of series in the merged df, one
+    process per series, all of them mapping df from a SharedFrame.
+    settings override AUTOML_SETTINGS. Returns one data frame with the
+    columns series,timestamp,csi,predicted_cpi,train_rows,best_loss .
+    """
+    jobs = jobs or os.cpu_count()
+
+    settings = worker_settings(settings)
+
+    print(f"[{dt.datetime.now()}] Forecasting {len(series)} series with {jobs} workers")
+
+    with SharedFrame(df) as shared, ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(forecast_one, shared, s, csi_values, horizon_csi, settings) for s in series]
+        forecasts = [f.result() for f in futures]
+
+    return pd.concat(forecasts, ignore_index=True)
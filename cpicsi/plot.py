@@ -0,0 +1,194 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+#################################################
+
+
+    # plots for the website
+
+
+#################################################
+
+HORIZONS = [12, 12 * 5, 12 * 10]
+
+
+def horizons(df):
+    """
+    Months plotted for df, the last 1, 5 and 10 years and all of it.
+    """
+    return HORIZONS + [df.shape[0]]
+
+
+TICK_STEPS = [1, 6, 12, 24, 60, 120]
+
+MAX_TICKS = 48
+
+
+def parse_timestamps(df):
+    """
+    df with typed timestamps, csv data files have them as strings.
+    """
+    if pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+        return df
+
+    return df.assign(timestamp=pd.to_datetime(df['timestamp']))
+
+
+def last_months(df, h):
+    """
+    The last h rows of df, or all of it if it is shorter.
+    """
+    return df.iloc[max(df.shape[0] - h, 0):]
+
+
+def tick_positions(timestamps, max_ticks=MAX_TICKS):
+    """
+    Positions of the rows to label on the x axis, the first row of every
+    month, 6 months, year... so that there are at most max_ticks labels.
+    Works the same for monthly, weekly or daily timestamps.
+    """
+    months = pd.to_datetime(timestamps).to_numpy().astype('datetime64[M]').astype('int64')
+
+    if len(months) < 1:
+        return np.array([], dtype=int)
+
+    first = np.r_[True, months[1:] != months[:-1]]
+    span = months[-1] - months[0] + 1
+    step = next((s for s in TICK_STEPS if span / s <= max_ticks), TICK_STEPS[-1])
+
+    # months count from January 1970, so step 12 lands on every January
+    return np.flatnonzero(first & (months % step == 0))
+
+
+def plot_horizon(df, h):
+    """
+    Figure with the last h months of df (timestamp,cpi,csi,predicted_cpi)
+    with typed timestamps, and a band between lower_cpi and upper_cpi
+    if the data file has prediction intervals.
+    """
+    df1 = last_months(df, h)
+
+    # rows are drawn at their position and only the ticks get a date
+    x = np.arange(df1.shape[0])
+    pos = tick_positions(df1['timestamp'])
+    labels = df1['timestamp'].iloc[pos].dt.strftime('%Y-%m-%d')
+
+    fig, ax = plt.subplots()
+
+    ax.plot(x, df1['cpi'], label="Actual level CPI")
+
+    if df1['predicted_cpi'].count() < 2:
+        ax.scatter(x, df1['predicted_cpi'], label="FLAML forecast CPI", color="orange")
+    else:
+        ax.plot(x, df1['predicted_cpi'], label="FLAML forecast CPI", color="orange")
+
+    if 'lower_cpi' in df1 and df1['lower_cpi'].count() > 0:
+        ax.fill_between(x, df1['lower_cpi'], df1['upper_cpi'], color="orange", alpha=0.3,
+                        label="Prediction interval")
+
+    ax.set_xlabel("timestamp")
+    ax.set_ylabel("CPI")
+    ax.set_xticks(pos, labels)
+    ax.tick_params(axis='x', labelrotation=90)
+    ax.legend()
+
+    ax2 = ax.twinx()
+
+    ax2.plot(x, df1['csi'], label="CSI", color="green")
+    ax2.set_ylabel("CSI")
+    ax2.legend()
+
+    fig.tight_layout()
+    return fig
+
+
+def plot_horizons(df, img_dir=None):
+    """
+    Plot every horizon of df one after another. The plots are saved to
+    img_dir as plot_h{months}.png or shown if img_dir is None.
+    """
+    df = parse_timestamps(df)
+
+    for h in horizons(df):
+        fig = plot_horizon(df, h)
+
+        if img_dir:
+            os.makedirs(img_dir, exist_ok=True)
+            fig.savefig(f"{img_dir}/plot_h{h}.png")
+        else:
+            plt.show()
+
+        plt.close(fig)
+
+
+#################################################
+
+
+    # headless rendering
+
+
+#################################################
+
+def use_agg():
+    plt.switch_backend("Agg")
+
+
+def render_horizon(df, h, img_dir):
+    """
+    Save the plot of one horizon to img_dir. Returns the horizon, the
+    path of the image and the seconds it took.
+    """
+    start = time.perf_counter()
+    path = f"{img_dir}/plot_h{h}.png"
+
+    fig = plot_horizon(df, h)
+    fig.savefig(path)
+    plt.close(fig)
+
+    return h, path, time.perf_counter() - start
+
+
+def render_horizons(df, img_dir, jobs=None):
+    """
+    Save the plots of every horizon to img_dir with the non-interactive
+    Agg backend, one process per plot. Returns the horizon, path and
+    seconds of every plot.
+    """
+    use_agg()
+    os.makedirs(img_dir, exist_ok=True)
+    df = parse_timestamps(df)
+
+    if jobs == 1:
+        return [render_horizon(df, h, img_dir) for h in horizons(df)]
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=use_agg) as pool:
+        futures = [pool.submit(render_horizon, df, h, img_dir) for h in horizons(df)]
+        return [f.result() for f in futures]
+
+
+def plot_test(X_test, y_test, y_pred):
+    """
+    Plot the true cpi against the predicted cpi of a test split.
+    """
+    fig, ax = plt.subplots()
+
+    ax.plot(X_test['timestamp'], y_test, label="Actual level CPI")
+    ax.plot(X_test['timestamp'], y_pred, label="FLAML forecast CPI")
+    ax.set_xlabel("timestamp")
+    ax.set_ylabel("CPI")
+    ax.legend()
+
+    ax2 = ax.twinx()
+
+    ax2.plot(X_test['timestamp'], X_test['csi'], label="CSI", color="green")
+    ax2.set_ylabel("CSI")
+    ax2.legend()
+
+    fig.tight_layout()
+    plt.show()
+    plt.close(fig)
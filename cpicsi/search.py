@@ -0,0 +1,92 @@
+import json
+
+#################################################
+
+
+    # automl search profiles
+
+
+#################################################
+
+# Settings on top of AUTOML_SETTINGS. "fast" stops after a number of
+# trials instead of a time budget, so it searches the same on any machine.
+PROFILES = {
+    "default": {},
+    "fast": {
+        "time_budget": -1,
+        "max_iter": 10,
+        "estimator_list": ["xgboost"],
+        "eval_method": "holdout",
+    },
+    "thorough": {
+        "time_budget": 120,
+        "estimator_list": ["xgboost", "lgbm", "rf", "extra_tree"],
+        "eval_method": "cv",
+    },
+}
+
+SEARCH_OPTIONS = ["time_budget", "max_iter", "estimator_list", "n_jobs", "eval_method", "seed", "log_file_name"]
+
+
+def add_search_arguments(parser):
+    """
+    Add the flags that configure the automl search to parser.
+    """
+    parser.add_argument("--profile", dest="profile", choices=list(PROFILES), help="""
+        Named search profile, fast for production runs, thorough for
+        research. The other search flags override it.
+""")
+    parser.add_argument("--search-config", dest="search_config", help="""
+        Path to a json file with automl settings, it can also name a
+        profile with the profile key. The search flags override it.
+""")
+    parser.add_argument("--time-budget", dest="time_budget", type=float, help="""
+        Seconds the automl search can take, -1 for no limit.
+""")
+    parser.add_argument("--max-iter", dest="max_iter", type=int, help="""
+        Maximum number of models tried by the automl search.
+""")
+    parser.add_argument("--estimators", dest="estimator_list", nargs="+", help="""
+        Estimators tried by the automl search, like xgboost lgbm rf.
+""")
+    parser.add_argument("--n-jobs", dest="n_jobs", type=int, help="""
+        Number of cores used to train every model, -1 for all of them.
+""")
+    parser.add_argument("--eval-method", dest="eval_method", choices=["holdout", "cv"], help="""
+        How the automl search scores the models.
+""")
+    parser.add_argument("--seed", dest="seed", type=int, help="""
+        Random seed of the automl search.
+""")
+    parser.add_argument("--trial-log", dest="log_file_name", help="""
+        Path to FLAML's log of every trial, cpi-csi.log by default.
+""")
+
+
+def search_settings(profile=None, config=None, **flags):
+    """
+    Automl settings from a profile, then a json config file at config,
+    then the flags that are not None, each one on top of the last.
+    """
+    config_settings = {}
+
+    if config:
+        with open(config) as f:
+            config_settings = json.load(f)
+
+    profile = profile or config_settings.get("profile")
+    config_settings.pop("profile", None)
+
+    if profile and profile not in PROFILES:
+        raise ValueError(f"Unknown search profile {profile}, use one of {', '.join(PROFILES)}.")
+
+    flags = {k: v for k, v in flags.items() if v is not None}
+    return {**PROFILES.get(profile, {}), **config_settings, **flags}
+
+
+def search_settings_from_args(args):
+    """
+    Automl settings from the flags added by add_search_arguments.
+    """
+    return search_settings(args.profile, args.search_config,
+                           **{o: getattr(args, o) for o in SEARCH_OPTIONS})
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+from cpicsi.data import parse_months, month_keys, key_months, timestamp_strings
+
+#################################################
+
+
+    # compact monthly series
+
+
+#################################################
+
+def is_monthly(timestamps):
+    """
+    Whether every timestamp is the first day of a month. Raises
+    ValueError if one isn't a date.
+    """
+    dates = parse_months(timestamps)
+    return bool((key_months(month_keys(dates)) == dates).all())
+
+
+class MonthlySeries:
+    """
+    A monthly series held as an int32 index of months since 1970-01 and
+    one float array per column, instead of a data frame with a string
+    timestamp per row. Slices and frames are views of the same arrays,
+    so the model and the plots get the data without copying it. Holding
+    thousands of series costs their arrays and little else.
+    """
+
+    __slots__ = ("months", "columns")
+
+    def __init__(self, months, columns):
+        self.months = np.asarray(months, dtype='int32')
+        self.columns = dict(columns)
+
+        for name, values in self.columns.items():
+            if len(values) != len(self.months):
+                raise ValueError(f"The {name} column has {len(values)} values for {len(self.months)} months.")
+
+    @classmethod
+    def from_frame(cls, df, columns=None, dtype='float64'):
+        """
+        The series of the data frame df with a timestamp column and the
+        columns, every one but timestamp by default, as dtype arrays,
+        float64 or float32. Columns that already have dtype aren't
+        copied. Raises ValueError if a timestamp isn't the first day of
+        a month.
+        """
+        dates = parse_months(df['timestamp'])
+        keys = month_keys(dates)
+
+        if (key_months(keys) != dates).any():
+            raise ValueError("The timestamps have to be the first day of a month.")
+
+        columns = columns or [c for c in df.columns if c != 'timestamp']
+        return cls(keys, {c: df[c].to_numpy(dtype) for c in columns})
+
+    def __len__(self):
+        return len(self.months)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def nbytes(self):
+        return self.months.nbytes + sum(v.nbytes for v in self.columns.values())
+
+    @property
+    def last_month(self):
+        return pd.Timestamp(key_months(self.months[-1:])[0])
+
+    def timestamps(self):
+        """
+        datetime64 of the first day of every month.
+        """
+        return key_months(self.months)
+
+    def slice(self, start=None, stop=None):
+        """
+        The months from row start to row stop, views of the same arrays.
+        """
+        rows = slice(start, stop)
+        return MonthlySeries(self.months[rows], {c: v[rows] for c, v in self.columns.items()})
+
+    def tail(self, n):
+        """
+        The last n months, or all of them if there are fewer.
+        """
+        return self.slice(max(len(self) - n, 0))
+
+    def append(self, months, columns):
+        """
+        A new series with the months (datetime64 or keys) and the values
+        of columns after these, in one copy of every array. Columns that
+        aren't given are NaN in the new months.
+        """
+        months = np.asarray(months)
+        if months.dtype.kind == 'M':
+            months = month_keys(months)
+
+        return MonthlySeries(np.concatenate([self.months, months]), {
+            c: np.concatenate([v, np.broadcast_to(np.asarray(columns.get(c, np.nan), dtype=v.dtype), len(months))])
+            for c, v in self.columns.items()
+        })
+
+    def frame(self, columns=None):
+        """
+        Data frame with the timestamp and the columns, all by default.
+        Only the timestamps are built, as the ISO strings the model is
+        trained on, the columns are views of the arrays of the series.
+        """
+        columns = columns or list(self.columns)
+        data = {'timestamp': timestamp_strings(self.timestamps())}
+        data.update({c: self.columns[c] for c in columns})
+        return pd.DataFrame(data, copy=False)
@@ -0,0 +1,286 @@
+import os
+import json
+import math
+import socketserver
+import threading
+import datetime as dt
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+from cpicsi.model import train, predict_scenarios, ModelStore
+from cpicsi.series import MonthlySeries
+from cpicsi.validate import validate_data_file
+from cpicsi.telemetry import Metrics
+
+#################################################
+
+
+    # model kept in memory
+
+
+#################################################
+
+class ForecastService:
+    """
+    The data file and the model fitted on it kept in memory to predict
+    the cpi of any csi without loading or training again. The data is
+    kept as a compact MonthlySeries, not the data frame read. The model is
+    fitted again in the background when the data file changes, and the
+    old one answers until the new one is ready.
+    """
+
+    def __init__(self, data_file, fmt=None, model_path=None, cold=False, settings=None, metrics=None):
+        self.data_file = data_file
+        self.fmt = fmt
+        self.store = ModelStore(model_path or data_file)
+        self.cold = cold
+        self.settings = settings or {}
+        self.metrics = metrics or Metrics()
+
+        self.automl = None
+        self.series = None
+        self.last_month = None
+        self.mtime = None
+        self.error = None
+        self.refitting = False
+        self.lock = threading.Lock()
+
+    def load(self):
+        """
+        Read and validate the data file and load the stored model if it
+        was trained up to its last month, or else fit a new one warm
+        started from the stored config. Raises ValueError if the data
+        file is not valid.
+        """
+        mtime = os.stat(self.data_file).st_mtime
+
+        print(f"[{dt.datetime.now()}] Loading data from {self.data_file}")
+        with self.metrics.span("validate", path=self.data_file) as span:
+            df, report = validate_data_file(self.data_file, self.fmt)[1:]
+            span["rows"] = len(df)
+
+        series = MonthlySeries.from_frame(df, ['cpi', 'csi'])
+        del df
+
+        for warning in report.warnings:
+            print(f"[{dt.datetime.now()}] Warning: {warning}")
+
+        last_month = pd.Timestamp(series.timestamps().max())
+
+        with self.metrics.span("load_model", path=self.store.pkl):
+            automl = self.store.load_model(last_month)
+
+        if automl:
+            print(f"[{dt.datetime.now()}] Loaded stored model from {self.store.pkl}")
+        else:
+            starting_points = None if self.cold else self.store.starting_points()
+
+            print(f"[{dt.datetime.now()}] Training model up to {last_month.date()}")
+            with self.metrics.span("fit", warm_start=bool(starting_points)) as span:
+                automl = train(series.frame(), starting_points=starting_points, **self.settings)
+                span["best_estimator"] = automl.best_estimator
+                span["best_loss"] = automl.best_loss
+
+            with self.metrics.span("save_model", path=self.store.pkl):
+                self.store.save(automl, last_month)
+
+        # only the swap is locked, predictions never wait for a fit
+        with self.lock:
+            self.automl = automl
+            self.series = series
+            self.last_month = last_month
+            self.mtime = mtime
+            self.error = None
+
+    def data_mtime(self):
+        try:
+            return os.stat(self.data_file).st_mtime
+        except OSError:
+            return None
+
+    def changed(self):
+        """
+        Whether the data file was modified since it was last loaded.
+        """
+        mtime = self.data_mtime()
+        return mtime is not None and mtime != self.mtime
+
+    def refit(self):
+        """
+        Load the data file and fit the model again, keeping the old model
+        if the new data file is not valid.
+        """
+        try:
+            self.load()
+        except (ValueError, OSError) as e:
+            print(f"[{dt.datetime.now()}] Error: {e}")
+            # don't try again until the file changes once more
+            with self.lock:
+                self.mtime = self.data_mtime()
+                self.error = str(e)
+        finally:
+            self.refitting = False
+
+    def watch(self, interval=5):
+        """
+        Check the data file every interval seconds and refit in the
+        background when it changes. Returns the watching thread.
+        """
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                if self.changed() and not self.refitting:
+                    print(f"[{dt.datetime.now()}] {self.data_file} changed, training again")
+                    self.refitting = True
+                    self.refit()
+
+        thread = threading.Thread(target=loop, daemon=True)
+        thread.stop = stop
+        thread.start()
+        return thread
+
+    def predict(self, csi_values, month=None):
+        """
+        Predict the cpi of the month after the data for every csi in
+        csi_values. Returns a data frame with the columns timestamp,csi,
+        predicted_cpi . The model only predicts one month ahead, so a
+        month other than that one raises ValueError.
+        """
+        with self.lock:
+            automl = self.automl
+            last_month = self.last_month
+
+        next_month = last_month + pd.DateOffset(months=1)
+
+        if month is not None and pd.Timestamp(month) != next_month:
+            raise ValueError(f"The model only predicts the month after the data, {next_month.date()}, "
+                             f"not {pd.Timestamp(month).date()}.")
+
+        month = next_month
+
+        with self.metrics.span("predict", rows=len(csi_values)):
+            return predict_scenarios(automl, pd.Timestamp(month), csi_values)
+
+    def status(self):
+        return {
+            "data_file": self.data_file,
+            "trained_until": str(self.last_month.date()) if self.last_month is not None else None,
+            "months": len(self.series) if self.series is not None else 0,
+            "data_bytes": self.series.nbytes if self.series is not None else 0,
+            "refitting": self.refitting,
+            "error": self.error,
+        }
+
+
+#################################################
+
+
+    # http server
+
+
+#################################################
+
+class ForecastHandler(BaseHTTPRequestHandler):
+    """
+    GET /predict?csi=80&csi=85&month=2025-01-01 or POST /predict with a
+    json body {"csi": [80, 85], "month": "2025-01-01"} returns the
+    predicted cpi of every csi for the month after the data, month is
+    optional and any other month is a 400, so is a csi that isn't a
+    finite number. GET /status returns the month the model was trained
+    up to and whether it is being fitted again.
+    """
+    service = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/status":
+            return self.send_json(200, self.service.status())
+
+        if url.path == "/predict":
+            return self.predict(query.get("csi", []), (query.get("month") or [None])[0])
+
+        self.send_json(404, {"error": f"Unknown path {url.path}, use /predict or /status."})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+
+        if url.path != "/predict":
+            return self.send_json(404, {"error": f"Unknown path {url.path}, use /predict."})
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or "{}")
+        except ValueError as e:
+            return self.send_json(400, {"error": f"The body is not valid json: {e}"})
+
+        if not isinstance(body, dict):
+            return self.send_json(400, {"error": "The body should be a json object with a csi key."})
+
+        csi = body.get("csi", [])
+        self.predict(csi if isinstance(csi, list) else [csi], body.get("month"))
+
+    def predict(self, csi, month):
+        try:
+            csi = [float(c) for c in csi]
+            month = pd.Timestamp(month) if month else None
+        except (TypeError, ValueError) as e:
+            return self.send_json(400, {"error": f"Invalid csi or month: {e}"})
+
+        if len(csi) < 1:
+            return self.send_json(400, {"error": "No csi provided, use /predict?csi=80 ."})
+
+        if not all(math.isfinite(c) for c in csi):
+            return self.send_json(400, {"error": "Invalid csi, nan and inf can't be predicted."})
+
+        try:
+            scenarios = self.service.predict(csi, month)
+        except ValueError as e:
+            return self.send_json(400, {"error": str(e)})
+        scenarios['timestamp'] = scenarios['timestamp'].astype(str)
+
+        self.send_json(200, {
+            "trained_until": self.service.status()["trained_until"],
+            "predictions": scenarios.to_dict(orient="records"),
+        })
+
+    def send_json(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # unix sockets have no client address
+        return self.client_address[0] if self.client_address else self.server.server_address
+
+    def log_message(self, format, *args):
+        print(f"[{dt.datetime.now()}] {self.address_string()} {format % args}")
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        socketserver.UnixStreamServer.server_bind(self)
+
+
+def make_server(service, host="127.0.0.1", port=8000, unix_socket=None):
+    """
+    Threaded http server answering with service, on host and port or on
+    the unix socket at unix_socket if it is given.
+    """
+    handler = type("Handler", (ForecastHandler,), {"service": service})
+
+    if unix_socket:
+        return UnixHTTPServer(unix_socket, handler)
+
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,85 @@
+import os
+import datetime as dt
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+#################################################
+
+
+    # history shared with worker processes
+
+
+#################################################
+
+# shared memory on linux, the files never reach the disk
+SHARED_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# frames already mapped by this process, by path
+_mapped = {}
+
+
+class SharedFrame:
+    """
+    The columns of a data frame written once as .npy files to a
+    temporary directory that worker processes map, instead of every
+    task getting its own pickled copy. Only the path and the column
+    names are pickled, and every worker maps the same pages, so N
+    workers don't parse or hold the data N times. The maps are copy on
+    write, FLAML assigns its timestamp column in place and only the
+    pages a worker writes become its own. String columns, like the ISO
+    timestamps the model is trained on, are stored as fixed width
+    unicode and come back as strings, and so do the Timestamp objects
+    FLAML leaves in the timestamp column of a frame it trained on. Use
+    it as a context manager, the files are removed on exit.
+    """
+
+    def __init__(self, df):
+        self.columns = list(df.columns)
+        self.path = tempfile.mkdtemp(prefix='cpicsi-', dir=SHARED_DIR)
+
+        try:
+            for i, c in enumerate(self.columns):
+                values = df[c].to_numpy()
+
+                if values.dtype == object:
+                    if not all(isinstance(v, (str, dt.datetime)) for v in values):
+                        raise ValueError(f"The {c} column can't be shared, only numbers, strings and timestamps can.")
+                    values = values.astype(str)
+
+                np.save(self.file(i), values)
+        except BaseException:
+            self.close()
+            raise
+
+    def file(self, i):
+        return os.path.join(self.path, f"{i}.npy")
+
+    def __getstate__(self):
+        return {"columns": self.columns, "path": self.path}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def frame(self):
+        """
+        The data frame, its columns mapped from the files without
+        copying them. Mapped once per process.
+        """
+        if self.path not in _mapped:
+            _mapped[self.path] = pd.DataFrame({c: np.load(self.file(i), mmap_mode='c')
+                                               for i, c in enumerate(self.columns)}, copy=False)
+
+        return _mapped[self.path]
+
+    def close(self):
+        _mapped.pop(self.path, None)
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from cpicsi.data import write_data_file
+
+#################################################
+
+
+    # synthetic cpi and csi series
+
+
+#################################################
+
+START = pd.Timestamp('1978-01-01')
+
+# pandas timestamps end in 2262, so longer series are made denser. The
+# values are the share of a month every period takes.
+FREQUENCIES = {'MS': 1, 'D': 12 / 365.25, 'h': 12 / 8766, 'min': 12 / 525960}
+
+# numpy datetime unit of every frequency, to join the series on
+UNITS = {'MS': 'M', 'D': 'D', 'h': 'h', 'min': 'm'}
+
+
+def synthetic_timestamps(rows, start=START):
+    """
+    rows consecutive months from start, or days, hours or minutes if
+    that many months don't fit before the last pandas timestamp.
+    """
+    for freq in FREQUENCIES:
+        end = start + (rows - 1) * pd.tseries.frequencies.to_offset(freq)
+        if end <= pd.Timestamp.max - pd.Timedelta(days=31):
+            return pd.date_range(start, periods=rows, freq=freq)
+
+    raise ValueError(f"{rows} rows don't fit in pandas' range of timestamps.")
+
+
+def synthetic_series(rows, seed=0):
+    """
+    Data frame with the columns timestamp,cpi,csi of rows periods. The
+    cpi grows like a random walk with drift from the first value of the
+    real series, about 0.3% a month, and the csi returns to its mean
+    like an AR(1) process.
+    """
+    from scipy.signal import lfilter
+
+    rng = np.random.default_rng(seed)
+    timestamps = synthetic_timestamps(rows)
+    months = FREQUENCIES[timestamps.freqstr]
+
+    growth = rng.normal(0.003 * months, 0.003 * np.sqrt(months), rows)
+    cpi = 62.7 * np.exp(np.cumsum(growth))
+
+    csi = 85.0 + lfilter([1], [1, -0.9], rng.normal(0, 4, rows))
+
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'cpi': cpi.round(3),
+        'csi': np.clip(csi, 40, 120).round(1),
+    })
+
+
+def write_synthetic_files(rows, directory, seed=0, fmt='csv'):
+    """
+    Write a synthetic series of rows periods to directory in every input
+    format of the scripts: cpi.csv (observation_date,CPIAUCSL),
+    csi_raw.csv as published by the University of Michigan, csi_clean.csv
+    (csi,date) and the data file data.{fmt} (timestamp,cpi,csi,
+    predicted_cpi). Returns the paths by name.
+    """
+    os.makedirs(directory, exist_ok=True)
+    df = synthetic_series(rows, seed)
+
+    paths = {
+        'cpi': os.path.join(directory, 'cpi.csv'),
+        'csi_raw': os.path.join(directory, 'csi_raw.csv'),
+        'csi_clean': os.path.join(directory, 'csi_clean.csv'),
+        'data': os.path.join(directory, f'data.{fmt}'),
+    }
+
+    date = df['timestamp'].astype(str)
+
+    df_cpi = pd.DataFrame({'observation_date': date, 'CPIAUCSL': df['cpi']})
+    df_cpi.to_csv(paths['cpi'], index=False, float_format='%.3f')
+
+    pd.DataFrame({'csi': df['csi'], 'date': date}).to_csv(paths['csi_clean'], index=False)
+
+    # the raw table only has months, so long series run past the year 9999
+    months = np.arange(rows)
+    with open(paths['csi_raw'], 'w') as f:
+        f.write("Table 1: The Index of Consumer Sentiment\n")
+        f.write("Month,Year,Index,\n")
+        pd.DataFrame({
+            'Month': months % 12 + 1,
+            'Year': START.year + months // 12,
+            'Index': df['csi'],
+            '': '',
+        }).to_csv(f, header=False, index=False)
+
+    write_data_file(df.assign(predicted_cpi=np.nan), paths['data'], fmt)
+
+    return paths
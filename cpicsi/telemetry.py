@@ -0,0 +1,126 @@
+import os
+import sys
+import json
+import time
+import datetime as dt
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+#################################################
+
+
+    # timing spans and metrics file
+
+
+#################################################
+
+def peak_memory_mb():
+    """
+    Peak resident memory of this process in MB, None where the
+    resource module is not available.
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # linux reports kilobytes, macos bytes
+    if sys.platform == "darwin":
+        peak = peak / 1024
+
+    return round(peak / 1024, 1)
+
+
+class Metrics:
+    """
+    Timing spans of a run written as json lines to path. Every record
+    has the run id, script, span name, seconds and peak memory. With no
+    path the spans are still timed but nothing is written. The last
+    keep records are also kept in records, a long running daemon
+    doesn't hold every span it ever wrote.
+    """
+
+    def __init__(self, path=None, script=None, keep=1000):
+        self.path = path
+        self.script = script
+        self.run = dt.datetime.now().strftime("%Y%m%dT%H%M%S.%f")
+        self.start = time.perf_counter()
+        self.records = deque(maxlen=keep)
+
+    def write(self, span, **fields):
+        record = {
+            "run": self.run,
+            "script": self.script,
+            "span": span,
+            **fields,
+        }
+        self.records.append(record)
+
+        if self.path:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+
+        return record
+
+    @contextmanager
+    def span(self, name, **fields):
+        """
+        Time the code in the with block as the span name.
+        """
+        start = time.perf_counter()
+        try:
+            yield fields
+        except Exception as e:
+            fields["error"] = str(e)
+            raise
+        finally:
+            self.write(name, seconds=round(time.perf_counter() - start, 6),
+                       peak_rss_mb=peak_memory_mb(), **fields)
+
+    def trials(self, log_file_name):
+        """
+        Write one record per trial of FLAML's log at log_file_name.
+        """
+        for trial in read_trial_log(log_file_name):
+            self.write("trial", **trial)
+
+    def finish(self, **fields):
+        """
+        Write the total time and peak memory of the run.
+        """
+        return self.write("run", seconds=round(time.perf_counter() - self.start, 6),
+                          peak_rss_mb=peak_memory_mb(), **fields)
+
+
+def read_trial_log(log_file_name):
+    """
+    Duration and metric of every trial in a FLAML log file.
+    """
+    trials = []
+
+    if not log_file_name or not os.path.exists(log_file_name):
+        return trials
+
+    with open(log_file_name) as f:
+        for line in f:
+            record = json.loads(line)
+
+            if "record_id" not in record:
+                continue
+
+            trials.append({
+                "trial": record["record_id"],
+                "learner": record.get("learner"),
+                "seconds": record.get("trial_time"),
+                "wall_clock_time": record.get("wall_clock_time"),
+                "validation_loss": record.get("validation_loss"),
+                "pred_time": (record.get("logged_metric") or {}).get("pred_time"),
+                "sample_size": record.get("sample_size"),
+            })
+
+    return trials
@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from cpicsi.data import DATA_COLUMNS, data_columns, read_data_file
+
+#################################################
+
+
+    # checking data files
+
+
+#################################################
+
+@dataclass
+class ValidationReport:
+    """
+    Result of checking a data file. Row numbers are lines of the file,
+    the header being line 1.
+    """
+    rows: int = 0
+    columns: list = field(default_factory=list)
+    missing: dict = field(default_factory=dict)
+    invalid_timestamps: list = field(default_factory=list)
+    duplicates: list = field(default_factory=list)
+    unsorted: list = field(default_factory=list)
+    gaps: list = field(default_factory=list)
+
+    @property
+    def errors(self):
+        """
+        Problems that make the data file unusable.
+        """
+        errors = []
+
+        if self.columns != data_columns(self.columns):
+            errors.append("""File doesn't contain necessary columns:
+
+              timestamp,cpi,csi,predicted_cpi""")
+            return errors
+
+        if self.rows < 1:
+            errors.append("data file doesn't contain any rows")
+
+        for col, row in self.missing.items():
+            errors.append(f"""There are missing values in the {col} column. There should
+    be no missing values in this column. The first missing value is
+    in row {row}.""")
+
+        if self.invalid_timestamps:
+            errors.append(f"""The timestamp column has values that are not dates. The first
+    one is in row {self.invalid_timestamps[0]}.""")
+
+        if self.duplicates:
+            errors.append(f"""The values in the timestamp column are not unique. Please make
+    sure that they are. Repeated: {', '.join(self.duplicates[:5])}""")
+
+        return errors
+
+    @property
+    def warnings(self):
+        """
+        Problems the model can still be trained with.
+        """
+        warnings = []
+
+        if self.unsorted:
+            warnings.append(f"""The timestamp column is not sorted, the first timestamp before
+    the one above it is in row {self.unsorted[0]}.""")
+
+        if self.gaps:
+            start, end = self.gaps[0]
+            warnings.append(f"""There are {len(self.gaps)} gaps of missing months in the
+    timestamp column, the first one between {start} and {end}.""")
+
+        return warnings
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def validate_data(input_df):
+    """
+    Check a data frame read from a data file for the necessary columns,
+    missing values, invalid, repeated or unsorted timestamps and gaps of
+    missing months. Every check is a vectorized pass over a column.
+    """
+    report = ValidationReport(rows=len(input_df), columns=list(input_df.columns))
+
+    if report.columns != data_columns(report.columns):
+        return report
+
+    # rows of the file, after the header
+    lines = np.arange(len(input_df)) + 2
+
+    nulls = input_df[DATA_COLUMNS[:3]].isna().to_numpy()
+    for i in np.flatnonzero(nulls.any(axis=0)):
+        report.missing[DATA_COLUMNS[i]] = int(lines[nulls[:, i].argmax()])
+
+    ts = pd.to_datetime(input_df['timestamp'], errors='coerce', format='ISO8601')
+    invalid = ts.isna().to_numpy() & ~nulls[:, 0]
+    report.invalid_timestamps = lines[invalid].tolist()
+
+    valid = ts.notna().to_numpy()
+    ts = ts[valid]
+    lines = lines[valid]
+
+    dup = ts.duplicated(keep='first').to_numpy()
+    report.duplicates = ts[dup].drop_duplicates().dt.strftime('%Y-%m-%d').tolist()
+
+    months = ts.to_numpy().astype('datetime64[M]').astype('int64')
+    steps = np.diff(months)
+    report.unsorted = lines[1:][steps < 0].tolist()
+
+    gaps = np.flatnonzero(steps > 1)
+    report.gaps = list(zip(ts.iloc[gaps].dt.strftime('%Y-%m-%d'),
+                           ts.iloc[gaps + 1].dt.strftime('%Y-%m-%d')))
+
+    return report
+
+
+def validate_data_file(path, fmt=None):
+    """
+    Read a data file with the columns timestamp,cpi,csi,predicted_cpi
+    (and maybe lower_cpi,upper_cpi) once and check it. Returns the whole
+    file, the past data with only timestamp,cpi,csi and the report.
+    Raises ValueError with the first error if the file is not valid.
+    """
+    input_df = read_data_file(path, fmt)
+    report = validate_data(input_df)
+
+    if report.errors:
+        raise ValueError(report.errors[0])
+
+    return input_df, input_df[DATA_COLUMNS[:3]].copy(), report
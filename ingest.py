@@ -0,0 +1,78 @@
+import argparse
+import datetime as dt
+
+#################################################
+
+
+    # parsing flags
+
+
+#################################################
+
+parser = argparse.ArgumentParser(description="""
+        Download the monthly cpi from FRED and the csi at the same time
+        into a local mirror, asking the servers only for files that
+        changed since the last run, and clean and merge them into the
+        data file used by cpi-csi.py only when one of them changed.
+""")
+parser.add_argument("-s", "--source", dest="sources", action="append", default=[],
+                    metavar="NAME=URL", help="""
+        Url to download a source from, cpi or csi. The csi can be the
+        UMCSENT series of FRED, the default, or the raw table of the
+        University of Michigan. Can be given more than once.
+""")
+parser.add_argument("-m", "--mirror", dest="mirror", default="mirror", help="""
+        Directory to keep the downloaded files in, mirror by default.
+""")
+parser.add_argument("-o", "--outfile", dest="outfile", default="data.csv", help="""
+        Path to the data file with the columns timestamp,cpi,csi,
+        predicted_cpi . Predictions already in it are kept.
+""")
+parser.add_argument("-f", "--format", dest="fmt", choices=["csv", "parquet", "feather"], help="""
+        Storage format of the data file, csv, parquet or feather. If not
+        provided, it is guessed from the file extension.
+""")
+parser.add_argument("--force", dest="force", action="store_true", help="""
+        Clean and merge the sources even if none of them changed.
+""")
+parser.add_argument("--timeout", dest="timeout", type=float, default=30, help="""
+        Seconds to wait for every server.
+""")
+
+args = parser.parse_args()
+
+sources = {}
+
+for source in args.sources:
+    name, sep, url = source.partition("=")
+
+    if not sep or not url:
+        print(f"""[{dt.datetime.now()}] Error:
+            The source {source} is not of the form NAME=URL. Correct usage:
+
+                python ingest.py -s cpi=http://localhost:8000/cpi.csv
+
+            If you want help run:
+
+                python ingest.py --help
+        """)
+        quit(-1)
+
+    sources[name] = url
+
+#################################################
+
+
+    # fetch, clean and merge
+
+
+#################################################
+
+from urllib.error import URLError
+from cpicsi.ingest import ingest
+
+try:
+    ingest(sources, args.mirror, args.outfile, args.fmt, args.force, args.timeout)
+except (URLError, ValueError, OSError) as e:
+    print(f"[{dt.datetime.now()}] Error: {e}")
+    quit(-1)
@@ -1,9 +1,7 @@
 import sys
-import os
 import argparse
 import datetime as dt
-import pandas as pd
-import matplotlib.pyplot as plt
+from cpicsi.telemetry import Metrics
 
 #################################################
 
@@ -24,14 +22,28 @@ parser.add_argument("data_path", help="""
         Path to the file containing the required data with the columns
         timestamp,csi,cpi,predicted_cpi .
 """)
+parser.add_argument("-f", "--format", dest="fmt", choices=["csv", "parquet", "feather"], help="""
+        Storage format of the data file, csv, parquet or feather. If not
+        provided, it is guessed from the file extension.
+""")
 parser.add_argument("-o", "--outdir", dest="img_dir", help="""
-        The directory path to save the images to.
+        The directory path to save the images to. The images are then
+        rendered without a display, one process per image.
+""")
+parser.add_argument("-j", "--jobs", dest="jobs", type=int, help="""
+        Number of images rendered in parallel with -o, defaults to the
+        number of cores.
+""")
+parser.add_argument("--metrics", dest="metrics", help="""
+        Path to a json lines file to append the time and peak memory of
+        every step of the run to.
 """)
 
-args = parser.parse_args()
+def main():
+    args = parser.parse_args()
 
-if len(sys.argv) < 2:
-    print("""[{dt.datetime.now()}] Error:
+    if len(sys.argv) < 2:
+        print("""[{dt.datetime.now()}] Error:
         There was no path provided for the data file.
         Corect usage:
             
@@ -41,10 +53,10 @@ if len(sys.argv) < 2:
             
             python plot.py --help
     """)
-    quit(-1)
+        quit(-1)
 
-if len(args.data_path) < 1:
-    print(f"""[{dt.datetime.now()}] Error:
+    if len(args.data_path) < 1:
+        print(f"""[{dt.datetime.now()}] Error:
         There was not path provided for the data.
         Path provided: {args.cpi_path} . Correct usage:
             
@@ -54,92 +66,60 @@ if len(args.data_path) < 1:
             
             python plot.py --help
     """)
-    quit(-1)
+        quit(-1)
 
-print(f"[{dt.datetime.now()}] Loading data from {args.data_path}")
-df = pd.read_csv(args.data_path)
+    from cpicsi import read_data_file, parse_months
 
-if len(df) < 1:
-    print("cpi csv doesn't contain any rows.")
-    quit(-1)
-
-#################################################
+    metrics = Metrics(args.metrics, "plot.py")
 
+    print(f"[{dt.datetime.now()}] Loading data from {args.data_path}")
 
-    # create plots for different time horizons
+    try:
+        with metrics.span("load", path=args.data_path):
+            df = read_data_file(args.data_path, args.fmt)
+    except ValueError as e:
+        print(f"[{dt.datetime.now()}] Error: {e}")
+        quit(-1)
 
+    if len(df) < 1:
+        print(f"[{dt.datetime.now()}] Error: data file doesn't contain any rows.")
+        quit(-1)
 
-#################################################
-
-rows = df.shape[0]
-
-horizons = [12, 12 * 5, 12 * 10, rows]
-
-for h in horizons:
-    dates_pos = []
-
-    df1 = df[rows - h - 1:]
-    if h == rows:
-        df1 = df
+    # parsed once for the plots of every horizon
+    try:
+        df = df.assign(timestamp=parse_months(df['timestamp']))
+    except ValueError as e:
+        print(f"[{dt.datetime.now()}] Error: {e}")
+        quit(-1)
 
     #################################################
 
 
-        # save wanted labels for plots
+        # create plots for different time horizons
 
 
     #################################################
 
-    l = 1
-    for i in range(df1.shape[0]):
-        if l == 1:
-            dates_pos.append(i)
-            if h > 12:
-                l = l + 1
-        elif l == 12 and h > 12 * 11:
-            l = 1
-        elif l == 6 and (h < 12 * 11 and h > 12):
-            l = 1
-        else:
-            l = l + 1
-
-    #################################################
-
-
-        # make plots
-
-
-    #################################################
-
-
-    fig, ax = plt.subplots()
-
-    ax.plot(df1['timestamp'], df1['cpi'], label="Actual level CPI")
-
-    df2 = df1.dropna()
-    if len(df2['predicted_cpi']) < 2:
-        ax.scatter(df1['timestamp'], df1['predicted_cpi'], label="FLAML forecast CPI", color="orange")
-    else:
-        ax.plot(df1['timestamp'], df1['predicted_cpi'], label="FLAML forecast CPI", color="orange")
+    if not args.img_dir:
+        from cpicsi.plot import plot_horizons
 
-    ax.set_xlabel("timestamp")
-    ax.set_ylabel("CPI")
-    ax.set_xticks(dates_pos)
-    ax.tick_params(axis='x', labelrotation=90)
-    plt.legend()
+        plot_horizons(df)
+        metrics.finish()
+        quit()
 
-    ax2 = ax.twinx()
+    import matplotlib
+    matplotlib.use("Agg")
+    from cpicsi.plot import render_horizons
 
-    ax2.plot(df1['timestamp'], df1['csi'], label="CSI", color="green")
-    ax2.set_ylabel("CSI")
-    plt.legend()
+    with metrics.span("render", jobs=args.jobs):
+        rendered = render_horizons(df, args.img_dir, args.jobs)
 
-    fig.tight_layout()
+    for h, path, seconds in rendered:
+        print(f"[{dt.datetime.now()}] Saved {path} in {seconds:.3f}s")
+        metrics.write("plot", horizon=h, path=path, seconds=round(seconds, 6))
 
-    if args.img_dir:
-        os.makedirs(args.img_dir, exist_ok=True)
-        plt.savefig(f"{args.img_dir}/plot_h{h}.png")
-    else:
-        plt.show()
+    metrics.finish()
 
 
+if __name__ == "__main__":
+    main()
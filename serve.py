@@ -0,0 +1,117 @@
+import os
+import argparse
+import datetime as dt
+from cpicsi.search import add_search_arguments, search_settings_from_args
+from cpicsi.telemetry import Metrics
+
+#################################################
+
+
+    # parsing flags
+
+
+#################################################
+
+parser = argparse.ArgumentParser(description="""
+        Serve cpi predictions over http from a model kept in memory. The
+        data file is loaded and the model fitted once, then every request
+        for the cpi of a csi is answered without loading or training
+        again. The model is fitted again in the background when the data
+        file changes.
+
+            curl "http://127.0.0.1:8000/predict?csi=80&csi=85"
+""")
+parser.add_argument("-d", "--data-file", dest="data_file", required=True, help="""
+        Path to the file containing the required data with the columns
+        timestamp,csi,cpi,predicted_cpi .
+""")
+parser.add_argument("-f", "--format", dest="fmt", choices=["csv", "parquet", "feather"], help="""
+        Storage format of the data file, csv, parquet or feather. If not
+        provided, it is guessed from the file extension.
+""")
+parser.add_argument("-m", "--model", dest="model_path", help="""
+        Path prefix for the model store, the stored model is used if it
+        was trained up to the last month of the data file. If not
+        provided, the store is kept next to the data file.
+""")
+parser.add_argument("--cold", dest="cold", action="store_true", help="""
+        Ignore the stored config and run the full search from scratch.
+""")
+parser.add_argument("--host", dest="host", default="127.0.0.1", help="""
+        Address to listen on, 127.0.0.1 by default.
+""")
+parser.add_argument("-p", "--port", dest="port", type=int, default=8000, help="""
+        Port to listen on, 8000 by default.
+""")
+parser.add_argument("-u", "--unix-socket", dest="unix_socket", help="""
+        Path to a unix socket to listen on instead of a port.
+""")
+parser.add_argument("--poll", dest="poll", type=float, default=5, help="""
+        Seconds between checks for changes of the data file, 0 to never
+        fit the model again.
+""")
+add_search_arguments(parser)
+parser.add_argument("--metrics", dest="metrics", help="""
+        Path to a json lines file to append the time and peak memory of
+        every fit and prediction to.
+""")
+
+args = parser.parse_args()
+
+if not os.path.exists(args.data_file):
+    print(f"""[{dt.datetime.now()}] Error:
+        The data file {args.data_file} doesn't exist. Correct usage:
+
+            python serve.py -d data_path.csv
+
+        If you want help run:
+
+            python serve.py --help
+    """)
+    quit(-1)
+
+#################################################
+
+
+    # load data and model once
+
+
+#################################################
+
+from cpicsi.serve import ForecastService, make_server
+
+metrics = Metrics(args.metrics, "serve.py")
+
+try:
+    service = ForecastService(args.data_file, args.fmt, args.model_path, args.cold,
+                              search_settings_from_args(args), metrics)
+    service.load()
+except (ValueError, OSError) as e:
+    print(f"[{dt.datetime.now()}] Error: {e}")
+    quit(-1)
+
+#################################################
+
+
+    # serve predictions
+
+
+#################################################
+
+if args.poll > 0:
+    service.watch(args.poll)
+
+server = make_server(service, args.host, args.port, args.unix_socket)
+address = args.unix_socket or f"http://{args.host}:{args.port}"
+
+print(f"[{dt.datetime.now()}] Serving predictions at {address}")
+
+try:
+    server.serve_forever()
+except KeyboardInterrupt:
+    print(f"[{dt.datetime.now()}] Stopping")
+finally:
+    server.server_close()
+    if args.unix_socket and os.path.exists(args.unix_socket):
+        os.remove(args.unix_socket)
+    metrics.finish()
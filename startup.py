@@ -0,0 +1,126 @@
+import os
+import sys
+import csv
+import time
+import argparse
+import subprocess
+import datetime as dt
+
+#################################################
+
+
+    # parsing flags
+
+
+#################################################
+
+parser = argparse.ArgumentParser(description="""
+        Measure the startup time of the command line scripts with
+        python -X importtime when they are only asked for --help, and
+        append the results to a csv file to track them over time. Exits
+        with an error if a script takes longer than the budget or fails.
+""")
+parser.add_argument("scripts", nargs="*", default=["cpi-csi.py", "plot.py", "test.py", "clean-csi.py", "bench.py", "serve.py", "ingest.py"], help="""
+        Scripts to measure, defaults to all of them.
+""")
+parser.add_argument("-b", "--budget", dest="budget", type=float, default=0.5, help="""
+        Maximum startup time in seconds for every script.
+""")
+parser.add_argument("-n", "--runs", dest="runs", type=int, default=3, help="""
+        Number of runs for each script, the fastest one is kept.
+""")
+parser.add_argument("-o", "--outfile", dest="outfile", default="startup.csv", help="""
+        Path to the csv file the results are appended to with the columns
+        timestamp,script,wall_s,import_s,slowest_import,budget_s,returncode .
+""")
+
+args = parser.parse_args()
+
+COLUMNS = ["timestamp", "script", "wall_s", "import_s", "slowest_import", "budget_s", "returncode"]
+
+new_file = not os.path.exists(args.outfile)
+
+if not new_file:
+    with open(args.outfile, newline="") as f:
+        header = next(csv.reader(f), [])
+
+    if header != COLUMNS:
+        print(f"[{dt.datetime.now()}] Error: {args.outfile} doesn't have the columns {','.join(COLUMNS)}")
+        quit(-1)
+
+#################################################
+
+
+    # measure every script
+
+
+#################################################
+
+def measure(script):
+    """
+    Wall time of `script --help` and the cumulative import time of its
+    top level imports, with the slowest of them, the exit code and the
+    last line of stderr.
+    """
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", script, "--help"],
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - start
+
+    imports = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+        # nested imports are indented under the one that pulled them in
+        if name.startswith("  "):
+            continue
+
+        imports[name.strip()] = int(cumulative) / 1e6
+
+    slowest = max(imports, key=imports.get) if imports else ""
+    errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+    return wall, sum(imports.values()), slowest, proc.returncode, errors[-1] if errors else ""
+
+
+results = []
+root = os.path.dirname(os.path.abspath(__file__))
+
+for script in args.scripts:
+    runs = [measure(os.path.join(root, script)) for _ in range(args.runs)]
+    # a run that fails is kept over any that doesn't
+    wall, imports, slowest, returncode, error = max(runs, key=lambda r: (r[3] != 0, -r[0]))
+    results.append([dt.datetime.now().isoformat(timespec="seconds"), script,
+                    round(wall, 3), round(imports, 3), slowest, args.budget, returncode])
+
+    if returncode != 0:
+        print(f"[{dt.datetime.now()}] {script}: failed with exit code {returncode}, {error}")
+    else:
+        print(f"[{dt.datetime.now()}] {script}: {wall:.3f}s wall, {imports:.3f}s imports, slowest import {slowest}")
+
+#################################################
+
+
+    # save results and check budget
+
+
+#################################################
+
+with open(args.outfile, "a", newline="") as f:
+    writer = csv.writer(f)
+    if new_file:
+        writer.writerow(COLUMNS)
+    writer.writerows(results)
+
+failed = [r[1] for r in results if r[6] != 0]
+over = [r[1] for r in results if r[2] > args.budget and r[6] == 0]
+
+if failed:
+    print(f"[{dt.datetime.now()}] Error: {', '.join(failed)} failed to start")
+
+if over:
+    print(f"[{dt.datetime.now()}] Error: startup over the {args.budget}s budget for {', '.join(over)}")
+
+if failed or over:
+    quit(-1)
@@ -1,11 +1,9 @@
+import os
 import sys
 import argparse
-import numpy as np
 import datetime as dt
-import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.metrics import r2_score
-from flaml import AutoML
+from cpicsi.search import add_search_arguments, search_settings_from_args
+from cpicsi.telemetry import Metrics
 
 #################################################
 
@@ -37,14 +35,44 @@ parser.add_argument("-d", "--data-file", dest="data_file", help="""
         Path to the file containing the required data with the columns
         timestamp,csi,cpi,predicted_cpi .
 """)
+parser.add_argument("-f", "--format", dest="fmt", choices=["csv", "parquet", "feather"], help="""
+        Storage format of the data file, csv, parquet or feather. If not
+        provided, it is guessed from the file extension.
+""")
+parser.add_argument("--horizon", dest="horizon", type=int, default=12, help="""
+        Number of months predicted and scored after every split.
+""")
+parser.add_argument("-b", "--backtest", dest="backtest", action="store_true", help="""
+        Instead of a single split with the last months, walk the split
+        forward over the whole history and score every split.
+""")
+parser.add_argument("--min-train", dest="min_train", type=int, default=120, help="""
+        Number of months used for training at the first backtest split.
+""")
+parser.add_argument("--step", dest="step", type=int, default=1, help="""
+        Number of months between two backtest splits.
+""")
+parser.add_argument("-j", "--jobs", dest="jobs", type=int, default=os.cpu_count(), help="""
+        Number of backtest splits trained in parallel, defaults to the
+        number of cores.
+""")
+parser.add_argument("-r", "--results", dest="results", default="backtest.csv", help="""
+        Path to the outfile for the backtest results with the columns
+        origin,train_rows,mape,r2,fit_seconds .
+""")
+add_search_arguments(parser)
+parser.add_argument("--metrics", dest="metrics", help="""
+        Path to a json lines file to append the time and peak memory of
+        every step of the run and of every automl trial to.
+""")
 
-
-args = parser.parse_args()
+def main():
+    args = parser.parse_args()
 
 
-if not args.data_file:
-    if len(sys.argv) < 3:
-        print(f"""[{dt.datetime.now()}] Error:
+    if not args.data_file:
+        if len(sys.argv) < 3:
+            print(f"""[{dt.datetime.now()}] Error:
             There was no path provided for the monthly cpi and csi data.
             Corect usage:
                 
@@ -54,10 +82,10 @@ if not args.data_file:
                 
                 python test.py --help
         """)
-        quit(-1)
+            quit(-1)
 
-    if len(args.cpi_path) < 1 or len(args.csi_path) < 1:
-        print(f"""[{dt.datetime.now()}] Error:
+        if len(args.cpi_path) < 1 or len(args.csi_path) < 1:
+            print(f"""[{dt.datetime.now()}] Error:
             There was not path provided for the monthly cpi or csi data.
             Paths provided, cpi: {args.cpi_path} , csi:{args.csi_path} .
 
@@ -67,10 +95,10 @@ if not args.data_file:
                 
                 python cpi-csi.py --help
         """)
-        quit(-1)
-else:
-    if len(args.data_file) < 1:
-        print(f"""[{dt.datetime.now()}] Error:
+            quit(-1)
+    else:
+        if len(args.data_file) < 1:
+            print(f"""[{dt.datetime.now()}] Error:
             There was not path provided for the monthly data file.
             Path provided: {args.data_file} . Correct usage:
 
@@ -84,150 +112,141 @@ else:
                 
                 python cpi-csi.py --help
         """)
-        quit(-1)
-
-df = pd.DataFrame()
-input_df = pd.DataFrame()
-
-if not args.data_file:
+            quit(-1)
 
     #################################################
 
 
-        # opening cpi and csi files
+        # load heavy dependencies only once the flags are valid
 
 
     #################################################
 
-    print(f"[{dt.datetime.now()}] Loading cpi data from {args.cpi_path}")
-    df_cpi = pd.read_csv(args.cpi_path)
-    print(f"[{dt.datetime.now()}] Loading csi data from {args.csi_path}")
-    df_csi = pd.read_csv(args.csi_path)
+    import pandas as pd
+    from cpicsi import (
+        AUTOML_SETTINGS,
+        load_series,
+        merge_cpi_csi,
+        unmatched_warnings,
+        validate_data_file,
+        train,
+        predict,
+        run_backtest,
+    )
 
-    if len(df_cpi) < 1:
-        print("cpi csv doesn't contain any rows.")
-        quit(-1)
+    metrics = Metrics(args.metrics, "test.py")
 
-    if len(df_csi) < 1:
-        print("csi csv doesn't contain any rows.")
-        quit(-1)
+    try:
+        settings = search_settings_from_args(args)
+        settings.setdefault("time_budget", 3)
 
-    df_cpi = df_cpi.rename(columns = {'observation_date': 'date', 'CPIAUCSL': 'cpi'})
+        if not args.data_file:
 
-    df = df_cpi.merge(df_csi, on='date')
-    df = df.rename(columns = {'date': 'timestamp'})
+            #################################################
 
-else:
 
-    #################################################
+                # opening cpi and csi files
 
 
-        # open data file and check for missing stuff
+            #################################################
 
+            print(f"[{dt.datetime.now()}] Loading cpi data from {args.cpi_path}")
+            with metrics.span("load", path=args.cpi_path):
+                df_cpi = load_series(args.cpi_path)
+            print(f"[{dt.datetime.now()}] Loading csi data from {args.csi_path}")
+            with metrics.span("load", path=args.csi_path):
+                df_csi = load_series(args.csi_path)
 
-    #################################################
+            with metrics.span("merge") as span:
+                df = merge_cpi_csi(df_cpi, df_csi)
+                span["rows"] = len(df)
 
-    print(f"[{dt.datetime.now()}] Loading data from {args.data_file}")
-    input_df = pd.read_csv(args.data_file)
-    df = pd.read_csv(args.data_file)
+            for warning in unmatched_warnings(df):
+                print(f"[{dt.datetime.now()}] Warning: {warning}")
 
-    del df['predicted_cpi']
+        else:
 
-    if list(input_df.columns) != ['timestamp', 'cpi','csi','predicted_cpi']:
-        print(f"""[{dt.datetime.now()}]
-              File doesn't contain necessary columns:
+            #################################################
 
-              timestamp,cpi,csi,predicted_cpi
-        """)
-        quit(-1)
 
+                # open data file and check for missing stuff
 
-    if len(df) < 1:
-        print(f"[{dt.datetime.now()}] Error: data file doesn't contain any rows")
-        quit(-1)
 
-    i = 1
-    aa = np.where(pd.isnull(input_df))
-    for a in aa[1]:
-        cols = ['timestamp', 'cpi', 'csi']
-        i += 1
+            #################################################
 
-        if a == 0 or a == 1 or a == 2:
-            print(f"""[{dt.datetime.now()}] Error:
-    There are missing values in the {cols[a]} column. There should
-    be no missing values in this column. The first missing value is
-    in row {i}.
-            """)
-            quit(-1)
+            print(f"[{dt.datetime.now()}] Loading data from {args.data_file}")
+            with metrics.span("validate", path=args.data_file) as span:
+                input_df, df, report = validate_data_file(args.data_file, args.fmt)
+                span["rows"] = len(df)
 
-    if len(input_df['timestamp'].unique()) != len(input_df['timestamp']):
-            print(f"""[{dt.datetime.now()}] Error:
-    The values in the timestamp column are not unique. Please make
-    sure that they are.
-            """)
-            quit(-1)
+            for warning in report.warnings:
+                print(f"[{dt.datetime.now()}] Warning: {warning}")
 
+    except (ValueError, OSError) as e:
+        print(f"[{dt.datetime.now()}] Error: {e}")
+        quit(-1)
 
-df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
 
-time_horizon = 12
-split_point = df.shape[0] - time_horizon
-train_df = df[:split_point]
-test_df = df[split_point:]
+    #################################################
 
-#################################################
 
+        # create, train model and make predictions
 
-    # create, train model and make predictions
 
+    #################################################
 
-#################################################
+    if args.backtest:
+        with metrics.span("backtest", jobs=args.jobs) as span:
+            results = run_backtest(df, horizon=args.horizon, min_train=args.min_train,
+                                   step=args.step, jobs=args.jobs, **settings)
+            span["origins"] = len(results)
+            span["fit_seconds"] = results['fit_seconds'].sum()
 
-automl = AutoML()
+        with metrics.span("save", path=args.results):
+            results.to_csv(args.results, index=False)
+        print(f"[{dt.datetime.now()}] Saved backtest results to {args.results}")
+        print("Mean MAPE of all splits: ", results['mape'].mean())
+        print("Mean R2 of all splits: ", results['r2'].mean())
+        metrics.finish()
+        quit()
 
-X_test = test_df[['timestamp', 'csi']]
-y_test = test_df['cpi']
+    time_horizon = args.horizon
+    split_point = df.shape[0] - time_horizon
+    train_df = df[:split_point]
+    test_df = df[split_point:]
 
-automl_settings = {
-    "time_budget": 3,
-    "metric": "mape",  
-    "task": "ts_forecast",  
-    "log_file_name": "cpi-csi.log",
-    "eval_method": "holdout",
-    "log_type": "all",
-    "label": "cpi",
-    "estimator_list": ["xgboost"],
-}
+    X_test = test_df[['timestamp', 'csi']]
+    y_test = test_df['cpi']
 
-automl.fit(dataframe=train_df, **automl_settings, period=time_horizon)
+    with metrics.span("fit", period=time_horizon) as span:
+        automl = train(train_df, period=time_horizon, **settings)
+        span["best_estimator"] = automl.best_estimator
+        span["best_loss"] = automl.best_loss
 
-y_pred = automl.predict(X_test)
+    metrics.trials(settings.get("log_file_name", AUTOML_SETTINGS["log_file_name"]))
 
-#################################################
+    with metrics.span("predict", rows=len(X_test)):
+        y_pred = predict(automl, X_test)
 
+    #################################################
 
-    # plot results
 
+        # plot results
 
-#################################################
 
-fig, ax = plt.subplots()
+    #################################################
 
-ax.plot(X_test['timestamp'], y_test, label="Actual level CPI")
-ax.plot(X_test['timestamp'], y_pred, label="FLAML forecast CPI")
-ax.set_xlabel("timestamp")
-ax.set_ylabel("CPI")
-plt.legend()
+    from sklearn.metrics import r2_score
+    from cpicsi.plot import plot_test
 
-ax2 = ax.twinx()
+    plot_test(X_test, y_test, y_pred)
 
-ax2.plot(X_test['timestamp'], X_test['csi'], label="CSI", color="green")
-ax2.set_ylabel("CSI")
-plt.legend()
+    print("R2 of true CPI vs predicted CPI: ", r2_score(y_test, y_pred))
 
-fig.tight_layout()
-plt.show()
+    metrics.finish()
+    quit()
 
-print("R2 of true CPI vs predicted CPI: ", r2_score(y_test, y_pred))
 
-quit()
+if __name__ == "__main__":
+    main()
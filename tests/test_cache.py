@@ -0,0 +1,31 @@
+import pandas as pd
+
+from cpicsi.cache import PredictionCache, prediction_key
+
+
+def test_least_recently_used_entry_is_dropped(tmp_path):
+    cache = PredictionCache(str(tmp_path / "cache.json"), max_entries=2)
+
+    cache.put("a", [1.0], {})
+    cache.put("b", [2.0], {})
+    cache.get("a")
+    cache.put("c", [3.0], {})
+
+    assert sorted(cache.load()) == ["a", "c"]
+
+
+def test_interval_bounds_are_cached(tmp_path):
+    cache = PredictionCache(str(tmp_path / "cache.json"))
+
+    cache.put("a", [1.0], {}, [0.5], [1.5])
+
+    entry = cache.get("a")
+    assert (entry["lower"], entry["upper"]) == ([0.5], [1.5])
+
+
+def test_key_ignores_how_the_data_was_read():
+    df = pd.DataFrame({'timestamp': ['2020-01-01'], 'cpi': [1], 'csi': [2.0]})
+    parsed = df.assign(timestamp=pd.to_datetime(df['timestamp']), cpi=1.0)
+
+    assert prediction_key(df, {}, 1, ['2020-02-01'], [80]) == prediction_key(parsed, {}, 1, ['2020-02-01'], [80.0])
+    assert prediction_key(df, {}, 1, ['2020-02-01'], [80]) != prediction_key(df, {}, 1, ['2020-02-01'], [81])
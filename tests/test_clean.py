@@ -0,0 +1,35 @@
+import pytest
+
+from cpicsi.clean import clean_csi
+
+RAW = "Table 1: The Index of Consumer Sentiment\nMonth,Year,Index,\n1,1978,83.7,\n2,1978,84.3,\n"
+
+
+def test_unknown_column_is_an_error(tmp_path):
+    path = tmp_path / "raw.csv"
+    path.write_text(RAW)
+
+    with pytest.raises(ValueError, match="doesn't have the columns Current"):
+        clean_csi(path, tmp_path / "clean.csv", column='Current')
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 100])
+def test_chunks_give_the_same_clean_table(tmp_path, chunksize):
+    path = tmp_path / "raw.csv"
+    # the empty lines at the end of the table are dropped
+    path.write_text(RAW + "3,1978,78.8,\n,,,\n")
+    outfile = tmp_path / "clean.csv"
+
+    clean_csi(path, outfile, chunksize=chunksize)
+
+    assert outfile.read_text() == "csi,date\n83.7,1978-01-01\n84.3,1978-02-01\n78.8,1978-03-01\n"
+
+
+def test_table_without_rows_gives_the_header(tmp_path):
+    path = tmp_path / "raw.csv"
+    path.write_text("Table 1: The Index of Consumer Sentiment\nMonth,Year,Index,\n")
+    outfile = tmp_path / "clean.csv"
+
+    clean_csi(path, outfile)
+
+    assert outfile.read_text() == "csi,date\n"
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpicsi.data import (
+    append_predictions,
+    join_months,
+    load_csi_values,
+    merge_cpi_csi,
+    parse_months,
+    prediction_rows,
+    read_data_file,
+    read_tail,
+    write_atomic,
+)
+
+
+def dates(*values):
+    return parse_months(list(values))
+
+
+def test_join_months_matches_months_in_any_order():
+    left, right, unmatched = join_months(dates('2020-02-01', '2020-01-01', '2020-03-01'),
+                                         dates('2020-1-1', '2020-02-01', '2020-04-01'))
+
+    assert left.tolist() == [1, 0]
+    assert right.tolist() == [0, 1]
+    assert unmatched == {"left": ['2020-03'], "right": ['2020-04']}
+
+
+def test_join_months_asof_takes_last_date_of_the_month():
+    left, right, _ = join_months(dates('2020-01-01', '2020-02-01'),
+                                 dates('2020-01-15', '2020-01-03', '2020-02-20', '2020-02-01'), asof=True)
+
+    assert left.tolist() == [0, 1]
+    assert right.tolist() == [0, 2]
+
+
+def test_join_months_rejects_repeated_months():
+    with pytest.raises(ValueError, match="repeated in the csi data: 2020-01"):
+        join_months(dates('2020-01-01'), dates('2020-01-01', '2020-01-15'), names=("cpi", "csi"))
+
+
+def test_merge_cpi_csi_matches_unpadded_dates():
+    df_cpi = pd.DataFrame({'observation_date': ['2020-01-01', '2020-02-01'], 'CPIAUCSL': [1.0, 2.0]})
+    df_csi = pd.DataFrame({'csi': [10.0, 20.0], 'date': ['2020-1-1', '2020-2-1']})
+
+    df = merge_cpi_csi(df_cpi, df_csi)
+
+    assert df['timestamp'].tolist() == ['2020-01-01', '2020-02-01']
+    assert df['csi'].tolist() == [10.0, 20.0]
+    assert df.attrs["unmatched"] == {"cpi": [], "csi": []}
+
+
+def test_load_csi_values_rejects_missing_column(tmp_path):
+    path = tmp_path / "csi.csv"
+    path.write_text("x\n1\n")
+
+    with pytest.raises(ValueError, match="csi column"):
+        load_csi_values(path)
+
+
+def test_read_tail_of_header_only_file(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("timestamp,cpi,csi,predicted_cpi\n")
+
+    assert read_tail(path) == ("timestamp,cpi,csi,predicted_cpi", None, True)
+
+
+@pytest.mark.parametrize("content", ["timestamp,cpi,csi,predicted_cpi\n",
+                                     "timestamp,cpi,csi,predicted_cpi\n2020-01-01,1.0,2.0,"])
+def test_append_predictions_to_existing_file(tmp_path, content):
+    path = tmp_path / "data.csv"
+    path.write_text(content)
+
+    append_predictions(str(path), prediction_rows(['2020-02-01'], [3.14159]))
+
+    df = read_data_file(str(path))
+    assert df['timestamp'].iloc[-1] == '2020-02-01'
+    assert df['predicted_cpi'].iloc[-1] == 3.142
+    assert df.shape[1] == 4
+
+
+def test_append_predictions_adds_interval_columns(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("timestamp,cpi,csi,predicted_cpi\n2020-01-01,1.0,2.0,\n")
+
+    append_predictions(str(path), prediction_rows(['2020-02-01'], [3.0], [2.0], [4.0]))
+
+    df = read_data_file(str(path))
+    assert list(df.columns[-2:]) == ['lower_cpi', 'upper_cpi']
+    assert np.isnan(df['lower_cpi'].iloc[0])
+    assert df['upper_cpi'].iloc[-1] == 4.0
+
+
+def test_write_atomic_leaves_no_temporary_file(tmp_path):
+    path = tmp_path / "out.bin"
+
+    write_atomic(str(path), b"abc")
+    write_atomic(str(path), lambda f: f.write(b"def"))
+
+    assert path.read_bytes() == b"def"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.bin"]
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from cpicsi.features import FeatureStore, add_features, feature_spec
+
+
+def series(n):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2000-01-01', periods=n, freq='MS'),
+        'cpi': 100 + rng.random(n).cumsum(),
+        'csi': 80 + rng.normal(0, 5, n),
+    })
+
+
+def test_incremental_features_equal_full_computation(tmp_path):
+    spec = feature_spec(1)
+    store = FeatureStore(str(tmp_path / "data.features.pkl"))
+    df = series(60)
+
+    _, computed = store.features(df.iloc[:40], spec)
+    assert computed == 40
+
+    incremental, computed = store.features(df, spec)
+    assert computed == 20
+
+    pd.testing.assert_frame_equal(incremental, add_features(df, spec))
+
+
+def test_changed_history_is_computed_again(tmp_path):
+    spec = feature_spec(1)
+    store = FeatureStore(str(tmp_path / "data.features.pkl"))
+    df = series(30)
+
+    store.features(df, spec)
+    df.loc[3, 'csi'] += 1
+
+    _, computed = store.features(df, spec)
+    assert computed == 30
+
+
+def test_feature_spec_drops_unknown_cpi_lags():
+    assert feature_spec(3)["cpi_lags"] == [3, 12]
@@ -0,0 +1,88 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from cpicsi.ingest import ingest
+
+CPI = "observation_date,CPIAUCSL\n2020-01-01,1.0\n2020-02-01,.\n2020-03-01,3.0\n"
+CSI = "observation_date,UMCSENT\n2020-01-01,10.0\n2020-02-01,20.0\n2020-03-01,30.0\n"
+
+
+class SourceHandler(BaseHTTPRequestHandler):
+    """
+    Serves files[path] with its etag, or a 304 if the request already
+    has it. Every request is kept in requests as (path, status).
+    """
+    files = {}
+    requests = []
+
+    def do_GET(self):
+        body, etag = self.files[self.path]
+
+        if self.headers.get("If-None-Match") == etag:
+            self.requests.append((self.path, 304))
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.requests.append((self.path, 200))
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    handler = type("Handler", (SourceHandler,), {"files": {}, "requests": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    yield handler, f"http://127.0.0.1:{server.server_address[1]}"
+
+    server.shutdown()
+    server.server_close()
+
+
+def run(tmp_path, url, **kwargs):
+    return ingest({"cpi": f"{url}/cpi", "csi": f"{url}/csi"}, str(tmp_path / "mirror"),
+                  str(tmp_path / "data.csv"), **kwargs)
+
+
+def test_ingest_fetches_again_only_what_changed(tmp_path, server):
+    handler, url = server
+    handler.files.update({"/cpi": (CPI, '"1"'), "/csi": (CSI, '"1"')})
+
+    assert sorted(run(tmp_path, url)) == ["cpi", "csi"]
+    df = pd.read_csv(tmp_path / "data.csv")
+    # the month FRED has no cpi for is left out
+    assert df['timestamp'].tolist() == ['2020-01-01', '2020-03-01']
+    assert df['cpi'].tolist() == [1.0, 3.0]
+
+    handler.requests.clear()
+    assert run(tmp_path, url) == []
+    assert sorted(handler.requests) == [("/cpi", 304), ("/csi", 304)]
+
+    # a new etag for the same content is fetched but isn't a change
+    handler.files["/cpi"] = (CPI, '"2"')
+    handler.requests.clear()
+    assert run(tmp_path, url) == []
+    assert ("/cpi", 200) in handler.requests
+
+    handler.files["/csi"] = (CSI.replace("30.0", "35.0"), '"2"')
+    assert run(tmp_path, url) == ["csi"]
+    assert pd.read_csv(tmp_path / "data.csv")['csi'].tolist() == [10.0, 35.0]
+
+
+def test_ingest_rejects_a_cpi_source_with_other_columns(tmp_path, server):
+    handler, url = server
+    handler.files.update({"/cpi": ("date,a,b\n2020-01-01,1,2\n", '"1"'), "/csi": (CSI, '"1"')})
+
+    with pytest.raises(ValueError, match="cpi source should have the columns"):
+        run(tmp_path, url)
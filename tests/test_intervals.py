@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpicsi.intervals import member_errors, prediction_intervals
+
+
+def test_bounds_are_quantiles_of_the_errors_of_the_same_month_ahead():
+    # 11 members, the first month ahead errs by -5%..5%, the second twice that
+    errors = np.column_stack([np.linspace(-0.05, 0.05, 11), np.linspace(-0.1, 0.1, 11)])
+
+    lower, upper = prediction_intervals([100.0, 200.0, 300.0], errors, level=0.8)
+
+    assert np.allclose(lower, [96.0, 184.0, 276.0])
+    assert np.allclose(upper, [104.0, 216.0, 324.0])
+
+
+def test_scenarios_use_the_first_month_ahead():
+    errors = np.array([[-0.1], [0.0], [0.1]])
+
+    lower, upper = prediction_intervals([100.0, 50.0], errors, level=1.0)
+
+    assert np.allclose(lower, [90.0, 45.0])
+    assert np.allclose(upper, [110.0, 55.0])
+
+
+def test_members_need_enough_months():
+    df = pd.DataFrame({'timestamp': ['2020-01-01', '2020-02-01'], 'cpi': [1.0, 2.0], 'csi': [3.0, 4.0]})
+
+    with pytest.raises(ValueError, match="not enough months"):
+        member_errors(df, automl=None, period=1)
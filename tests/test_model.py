@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from cpicsi.model import update_plan
+
+
+class ConstantModel:
+    def predict(self, X):
+        return np.full(len(X), 80.0)
+
+
+def plan(**info):
+    df = pd.DataFrame({
+        'timestamp': pd.date_range('2020-01-01', periods=5, freq='MS'),
+        'cpi': [100.0] * 5,
+        'csi': [1.0] * 5,
+    })
+    info = dict({"trained_until": "2020-02-01", "searched_until": "2020-02-01", "period": 1, "best_loss": 0.1}, **info)
+    return update_plan(info, ConstantModel(), df)
+
+
+def test_update_scores_the_mape_of_the_new_months():
+    action, reason, error = plan()
+
+    assert action == "update"
+    assert np.isclose(error, 0.2)
+    assert "1 of 3 new months" in reason
+
+
+def test_search_on_drift_schedule_or_no_loss():
+    assert plan(best_loss=0.05)[0] == "search"
+    assert plan(searched_until="2019-01-01")[0] == "search"
+    assert plan(best_loss=float('inf'))[0] == "search"
+
+
+def test_training_on_merged_data_matches_baseline_forecast():
+    from cpicsi.data import load_series, merge_cpi_csi
+    from cpicsi.model import train, predict
+    from cpicsi.search import PROFILES
+
+    data = os.path.join(os.path.dirname(__file__), '..', 'data')
+    df = merge_cpi_csi(load_series(os.path.join(data, 'cpi-monthly.csv')), load_series(os.path.join(data, 'csi_clean.csv')))
+    assert df['timestamp'].iloc[-1] == '2025-03-01'
+
+    # trained on datetime64 timestamps FLAML forecasts 317.38 here and
+    # is several times slower per trial
+    automl = train(df, verbose=0, log_file_name='', **PROFILES['fast'])
+    X_test = pd.DataFrame({'timestamp': [pd.Timestamp('2025-04-01')], 'csi': [60.0]})
+
+    assert abs(predict(automl, X_test)[0] - 316.248) < 0.1
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from cpicsi.multi import FORECAST_COLUMNS, append_forecasts, load_cpi_series, merge_series
+
+
+LONG = """observation_date,series_id,value
+2020-01-01,CPIAUCSL,1.0
+2020-01-01,CPILFESL,10.0
+2020-02-01,CPIAUCSL,2.0
+2020-02-01,CPILFESL,20.0
+2020-03-01,CPIAUCSL,3.0
+"""
+
+
+def test_long_series_are_read_wide(tmp_path):
+    path = tmp_path / "long.csv"
+    path.write_text(LONG)
+
+    df = load_cpi_series(str(path))
+
+    assert list(df.columns) == ['date', 'CPIAUCSL', 'CPILFESL']
+    assert df['CPIAUCSL'].tolist() == [1.0, 2.0, 3.0]
+    assert df['CPILFESL'].isna().tolist() == [False, False, True]
+
+
+def test_file_without_series_is_an_error(tmp_path):
+    path = tmp_path / "dates.csv"
+    path.write_text("observation_date\n2020-01-01\n")
+
+    with pytest.raises(ValueError, match="doesn't contain any series"):
+        load_cpi_series(str(path))
+
+
+def test_merge_series_joins_every_series_with_the_csi(tmp_path):
+    path = tmp_path / "long.csv"
+    path.write_text(LONG)
+    df_csi = pd.DataFrame({'csi': [50.0, 60.0, 70.0], 'date': ['2020-1-1', '2020-2-1', '2020-4-1']})
+
+    df = merge_series(load_cpi_series(str(path)), df_csi)
+
+    assert list(df.columns) == ['timestamp', 'csi', 'CPIAUCSL', 'CPILFESL']
+    assert df['timestamp'].tolist() == ['2020-01-01', '2020-02-01']
+    assert df['csi'].tolist() == [50.0, 60.0]
+    assert df['CPILFESL'].tolist() == [10.0, 20.0]
+    assert df.attrs["unmatched"] == {"cpi": ['2020-03'], "csi": ['2020-04']}
+
+
+def forecasts(loss=0.1):
+    return pd.DataFrame({'series': ['CPIAUCSL'], 'timestamp': ['2025-04-01'], 'csi': [60.0],
+                         'predicted_cpi': [316.248], 'train_rows': [568], 'best_loss': [loss]})
+
+
+def test_append_forecasts_creates_and_appends(tmp_path):
+    path = tmp_path / "forecasts.csv"
+
+    append_forecasts(str(path), forecasts(0.1))
+    append_forecasts(str(path), forecasts(0.2))
+
+    df = pd.read_csv(path)
+    assert list(df.columns) == FORECAST_COLUMNS
+    assert df['best_loss'].tolist() == [0.1, 0.2]
+
+
+def test_append_forecasts_rejects_data_files(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("timestamp,cpi,csi,predicted_cpi\n2020-01-01,1.0,2.0,\n")
+
+    with pytest.raises(ValueError, match="columns of the forecasts"):
+        append_forecasts(str(path), forecasts())
+
+    assert path.read_text() == "timestamp,cpi,csi,predicted_cpi\n2020-01-01,1.0,2.0,\n"
@@ -0,0 +1,43 @@
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+from cpicsi.plot import last_months, tick_positions
+
+
+def months(start, periods, freq='MS'):
+    return pd.Series(pd.date_range(start, periods=periods, freq=freq))
+
+
+def test_last_months_keeps_exactly_h_rows():
+    df = pd.DataFrame({'timestamp': months('2020-01-01', 30), 'cpi': np.arange(30.0)})
+
+    # the old slice df[rows - h - 1:] kept h + 1 rows
+    assert last_months(df, 12)['cpi'].tolist() == list(np.arange(18.0, 30.0))
+    assert len(last_months(df, 100)) == 30
+
+
+def test_every_month_is_labeled_up_to_a_year():
+    assert tick_positions(months('2020-03-01', 12)).tolist() == list(range(12))
+
+
+def test_long_spans_label_januaries():
+    timestamps = months('1978-01-01', 12 * 40)
+    pos = tick_positions(timestamps)
+
+    assert len(pos) <= 48
+    assert (timestamps.iloc[pos].dt.month == 1).all()
+    assert pos[0] == 0
+
+
+def test_daily_timestamps_label_the_first_day_of_the_months():
+    timestamps = months('2020-01-15', 60, freq='D')
+
+    assert timestamps.iloc[tick_positions(timestamps)].dt.strftime('%Y-%m-%d').tolist() == \
+        ['2020-01-15', '2020-02-01', '2020-03-01']
+
+
+def test_no_timestamps_no_ticks():
+    assert len(tick_positions(pd.Series([], dtype='datetime64[ns]'))) == 0
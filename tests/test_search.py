@@ -0,0 +1,40 @@
+import argparse
+import json
+
+import pytest
+
+from cpicsi.search import PROFILES, add_search_arguments, search_settings, search_settings_from_args
+
+
+def test_config_goes_over_the_profile_and_flags_over_both(tmp_path):
+    config = tmp_path / "search.json"
+    config.write_text(json.dumps({"profile": "fast", "max_iter": 5, "seed": 1}))
+
+    settings = search_settings(config=str(config), seed=7, n_jobs=None)
+
+    assert settings == dict(PROFILES["fast"], max_iter=5, seed=7)
+
+
+def test_profile_flag_wins_over_the_config_profile(tmp_path):
+    config = tmp_path / "search.json"
+    config.write_text(json.dumps({"profile": "fast"}))
+
+    assert search_settings("thorough", str(config)) == PROFILES["thorough"]
+
+
+def test_unknown_profile_is_an_error(tmp_path):
+    config = tmp_path / "search.json"
+    config.write_text(json.dumps({"profile": "quick"}))
+
+    with pytest.raises(ValueError, match="Unknown search profile quick"):
+        search_settings(config=str(config))
+
+
+def test_settings_from_flags():
+    parser = argparse.ArgumentParser()
+    add_search_arguments(parser)
+
+    args = parser.parse_args(["--profile", "fast", "--max-iter", "3", "--estimators", "lgbm", "rf"])
+
+    assert search_settings_from_args(args) == dict(PROFILES["fast"], max_iter=3, estimator_list=["lgbm", "rf"])
+    assert search_settings_from_args(parser.parse_args([])) == {}
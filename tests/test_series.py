@@ -0,0 +1,49 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpicsi.series import MonthlySeries, is_monthly
+from cpicsi.shared import SharedFrame
+
+
+def frame():
+    return pd.DataFrame({'timestamp': ['2020-01-01', '2020-02-01', '2020-03-01'],
+                         'cpi': [1.0, 2.0, 3.0], 'csi': [4.0, 5.0, 6.0]})
+
+
+def test_frames_and_tails_are_views():
+    series = MonthlySeries.from_frame(frame())
+
+    assert np.shares_memory(series.frame()['cpi'].to_numpy(), series['cpi'])
+    assert series.frame()['timestamp'].tolist() == frame()['timestamp'].tolist()
+    assert np.shares_memory(series.tail(2)['csi'], series['csi'])
+    assert series.last_month == pd.Timestamp('2020-03-01')
+
+
+def test_sub_monthly_timestamps_are_rejected():
+    df = frame().assign(timestamp=['2020-01-01', '2020-01-02', '2020-01-03'])
+
+    assert not is_monthly(df['timestamp'])
+    with pytest.raises(ValueError):
+        MonthlySeries.from_frame(df)
+
+
+@pytest.mark.parametrize("df", [frame(), frame().assign(timestamp=lambda d: pd.to_datetime(d['timestamp']))])
+def test_shared_frame_round_trip(df):
+    with SharedFrame(df) as shared:
+        copy = pickle.loads(pickle.dumps(shared))
+        pd.testing.assert_frame_equal(copy.frame(), df)
+
+
+def test_shared_frame_rejects_mixed_objects():
+    with pytest.raises(ValueError):
+        SharedFrame(frame().assign(timestamp=['2020-01-01', None, 3]))
+
+
+def test_shared_frame_turns_timestamp_objects_into_strings():
+    df = frame().assign(timestamp=lambda d: pd.to_datetime(d['timestamp']).astype(object))
+
+    with SharedFrame(df) as shared:
+        assert shared.frame()['timestamp'].tolist() == ['2020-01-01 00:00:00', '2020-02-01 00:00:00', '2020-03-01 00:00:00']
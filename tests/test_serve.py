@@ -0,0 +1,39 @@
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from cpicsi.serve import make_server
+from cpicsi.telemetry import Metrics
+
+
+class FailingService:
+    def predict(self, csi_values, month=None):
+        raise AssertionError("the request should have been rejected")
+
+
+@pytest.mark.parametrize("csi", ["nan", "inf", "-inf", "x"])
+def test_predict_rejects_csi_that_is_not_a_finite_number(csi):
+    server = make_server(FailingService(), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        with pytest.raises(HTTPError) as e:
+            urlopen(f"http://127.0.0.1:{server.server_address[1]}/predict?csi={csi}")
+
+        assert e.value.code == 400
+        assert "Invalid csi" in json.load(e.value)["error"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_metrics_keep_only_the_last_records():
+    metrics = Metrics(keep=3)
+
+    for i in range(5):
+        metrics.write("predict", i=i)
+
+    assert [r["i"] for r in metrics.records] == [2, 3, 4]
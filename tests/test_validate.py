@@ -0,0 +1,50 @@
+import warnings
+
+import pandas as pd
+
+from cpicsi.validate import validate_data, validate_data_file
+
+
+def data(timestamps, cpi=None):
+    n = len(timestamps)
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'cpi': cpi if cpi is not None else [1.0] * n,
+        'csi': [2.0] * n,
+        'predicted_cpi': [None] * n,
+    })
+
+
+def test_rows_are_lines_of_the_file():
+    report = validate_data(data(['2020-01-01', 'x', '2020-03-01', '2020-02-01'], [1.0, 1.0, None, 1.0]))
+
+    # the header is line 1
+    assert report.missing == {'cpi': 4}
+    assert report.invalid_timestamps == [3]
+    assert report.unsorted == [5]
+
+
+def test_duplicates_and_gaps():
+    report = validate_data(data(['2020-01-01', '2020-01-01', '2020-04-01']))
+
+    assert report.duplicates == ['2020-01-01']
+    assert report.gaps == [('2020-01-01', '2020-04-01')]
+    assert not report.ok
+
+
+def test_missing_columns():
+    report = validate_data(pd.DataFrame({'timestamp': ['2020-01-01'], 'cpi': [1.0]}))
+
+    assert report.errors[0].startswith("File doesn't contain necessary columns")
+
+
+def test_past_data_can_be_changed_without_touching_the_file_data(tmp_path):
+    path = tmp_path / "data.csv"
+    data(['2020-01-01', '2020-02-01']).to_csv(path, index=False)
+    input_df, df, _ = validate_data_file(str(path))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+
+    assert input_df['timestamp'].tolist() == ['2020-01-01', '2020-02-01']